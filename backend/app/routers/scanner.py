@@ -257,7 +257,11 @@ async def run_scan(scan_id: str, request: ScanRequest):
                     'file_io': request.detect_files,
                     'message_queues': request.detect_messages,
                     'data_transforms': request.detect_transforms,
-                }
+                },
+                # Large repositories are scanned in spawned worker processes
+                'parallel': {'enabled': True},
+                # Repositories are mounted read-only; don't try to cache scan results
+                'cache': {'enabled': False},
             },
             'output': {
                 'directory': f'/tmp/scan-results/{scan_id}',
@@ -1,17 +1,84 @@
 """Workflow graph builder - orchestrates scanning and graph construction."""
 
+import fnmatch
+import hashlib
+import heapq
+import json
+import multiprocessing
 import os
+import pickle
+import re
+import sys
+import tempfile
 import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Any
 
-from models import WorkflowGraph, WorkflowNode, WorkflowEdge, ScanResult
+from models import WorkflowGraph, WorkflowNode, WorkflowEdge, WorkflowType, ScanResult
 from scanner import CSharpScanner, TypeScriptScanner, ReactScanner, AngularScanner, WPFScanner
 
 
+# Per-process state for parallel scan workers (set by _init_scan_worker)
+_worker_builder = None
+_worker_schemas = None
+
+
+def _init_scan_worker(config: Dict[str, Any], schema_registry: dict, file_graph_cache=None):
+    """Process pool initializer: build scanners once per worker."""
+    global _worker_builder, _worker_schemas
+    _worker_builder = WorkflowGraphBuilder(config)
+    _worker_builder._file_graph_cache = file_graph_cache
+    _worker_schemas = schema_registry
+
+
+def _scan_in_worker(file_path: str) -> tuple:
+    """Process pool task: scan a single file in a worker process."""
+    return _worker_builder._scan_single_file(file_path, _worker_schemas)
+
+
+def _emit_pattern_edges(src_indices: List[int], src_lines: List[int],
+                        dst_indices: List[int], dst_lines: List[int], window: int):
+    """Yield (source, target) node index pairs for one data-flow pattern.
+
+    Both sides must be sorted by line. Each target lies strictly after its
+    source and at most `window` lines later. Because sources are visited in
+    line order, the start of the target window only moves forward, so one
+    two-pointer sweep replaces a binary search per source.
+    """
+    start = 0
+    dst_count = len(dst_lines)
+    for src_idx, src_line in zip(src_indices, src_lines):
+        # Advance past targets at or before this source's line
+        while start < dst_count and dst_lines[start] <= src_line:
+            start += 1
+
+        max_line = src_line + window
+        for i in range(start, dst_count):
+            # Early termination: past the range, stop
+            if dst_lines[i] > max_line:
+                break
+            yield src_idx, dst_indices[i]
+
+
 class WorkflowGraphBuilder:
     """Builds workflow graphs from repository scanning."""
 
+    # Files up to this size are read once here and handed to scanners as bytes
+    MAX_PREREAD_BYTES = 4 * 1024 * 1024
+
+    # Below this many files, process pool startup costs more than it saves
+    PARALLEL_MIN_FILES = 200
+
+    # Serial scans read ahead this many files on a few I/O threads
+    PREFETCH_FILES = 16
+    PREFETCH_WORKERS = 4
+
+    # Bump when scanner output changes so cached file graphs are invalidated
+    CACHE_VERSION = 1
+
     def __init__(self, config: Dict[str, Any]):
         """Initialize graph builder.
 
@@ -20,6 +87,11 @@ class WorkflowGraphBuilder:
         """
         self.config = config
         self.scanners = self._initialize_scanners()
+        self._scanner_by_ext = self._build_scanner_lookup(self.scanners)
+        self._file_graph_cache = None
+        # Cache directory -> whether it could be written (checked once each)
+        self._cache_dir_writable = {}
+        self._cache_write_failed = False
 
     def _initialize_scanners(self) -> List:
         """Initialize all available scanners."""
@@ -35,9 +107,43 @@ class WorkflowGraphBuilder:
 
         return scanners
 
+    @staticmethod
+    def _build_scanner_lookup(scanners: List) -> Dict[str, Any]:
+        """Map final file extensions to the scanner that always wins for them.
+
+        Scanners are tried in order, so the first scanner declaring an extension
+        claims it. A compound suffix (e.g. '.xaml.cs') only matches some paths
+        with its final extension, so that extension is left out of the map unless
+        an earlier scanner already claims it outright; those paths fall back to
+        asking each scanner in turn.
+
+        Args:
+            scanners: Scanners in priority order
+
+        Returns:
+            Dictionary of extension (e.g. '.ts') to scanner
+        """
+        scanner_by_ext = {}
+        ambiguous = set()
+        for scanner in scanners:
+            for suffix in scanner.file_extensions:
+                ext = '.' + suffix.rsplit('.', 1)[-1]
+                if ext in scanner_by_ext:
+                    continue
+                if suffix != ext or ext in ambiguous:
+                    ambiguous.add(ext)
+                else:
+                    scanner_by_ext[ext] = scanner
+        return scanner_by_ext
+
     def build(self, repository_path: str, progress_callback=None) -> ScanResult:
         """Build workflow graph from repository.
 
+        With scanner.parallel.enabled set, large repositories are scanned in
+        spawned worker processes, which re-import the caller's main module; a
+        script that calls build() must then do so under
+        `if __name__ == "__main__":`.
+
         Args:
             repository_path: Path to repository to scan
             progress_callback: Optional callback function(current, total, message) for progress updates
@@ -67,13 +173,14 @@ class WorkflowGraphBuilder:
 
         # Find all files to scan
         print("🔍 Discovering files...")
-        files_to_scan = self._find_files(repository_path, include_extensions, exclude_dirs)
+        files_to_scan, cs_files = self._find_files(repository_path, include_extensions, exclude_dirs)
+        total_files = len(files_to_scan)
 
-        print(f"✓ Found {len(files_to_scan):,} files to scan\n")
+        print(f"✓ Found {total_files:,} files to scan\n")
 
         # Notify callback of total files discovered
         if progress_callback:
-            progress_callback(0, len(files_to_scan), f"Found {len(files_to_scan):,} files to scan")
+            progress_callback(0, total_files, f"Found {total_files:,} files to scan")
 
         # FIRST PASS: Discover database schemas/models
         print("="*60)
@@ -81,14 +188,14 @@ class WorkflowGraphBuilder:
         print("="*60)
 
         if progress_callback:
-            progress_callback(0, len(files_to_scan), "Discovering database schemas...")
+            progress_callback(0, total_files, "Discovering database schemas...")
 
-        self._discover_schemas(files_to_scan, result, progress_callback)
+        self._discover_schemas(cs_files, result, progress_callback)
 
         print(f"✓ Found {len(result.schemas_discovered):,} database schemas\n")
 
         if progress_callback:
-            progress_callback(0, len(files_to_scan), f"Schema discovery complete: {len(result.schemas_discovered):,} tables found")
+            progress_callback(0, total_files, f"Schema discovery complete: {len(result.schemas_discovered):,} tables found")
 
         # SECOND PASS: Scan files for workflow operations
         print("="*60)
@@ -96,66 +203,90 @@ class WorkflowGraphBuilder:
         print("="*60)
 
         last_print_time = time.time()
+        graph_nodes = result.graph.nodes
 
-        # Scan each file
-        for file_path in files_to_scan:
-            try:
-                # Find appropriate scanner
-                scanner = self._get_scanner_for_file(file_path)
-
-                if scanner:
-                    # Pass schema registry to scanner for enhanced table name detection
-                    file_graph = scanner.scan_file(file_path, schema_registry=result.schemas_discovered)
-                    # Merge file graph into result graph
-                    self._merge_graphs(result.graph, file_graph)
-                    result.files_scanned += 1
-
-                    current_time = time.time()
-
-                    # Print progress every 10 files OR every 5 seconds
-                    if result.files_scanned % 10 == 0 or (current_time - last_print_time) >= 5:
-                        elapsed = current_time - start_time
-                        progress_pct = (result.files_scanned / len(files_to_scan)) * 100
-
-                        # Calculate estimated time remaining
-                        if result.files_scanned > 0:
-                            avg_time_per_file = elapsed / result.files_scanned
-                            remaining_files = len(files_to_scan) - result.files_scanned
-                            eta_seconds = avg_time_per_file * remaining_files
-                            eta_minutes = int(eta_seconds / 60)
-                            eta_seconds_remainder = int(eta_seconds % 60)
-                            eta_str = f"{eta_minutes}m {eta_seconds_remainder}s"
-                        else:
-                            eta_str = "calculating..."
-
-                        # Get relative file path for display
-                        display_path = file_path.replace(repository_path, '')
-                        if len(display_path) > 50:
-                            display_path = '...' + display_path[-47:]
-
-                        progress_msg = (f"[{progress_pct:5.1f}%] {result.files_scanned:,}/{len(files_to_scan):,} files | "
-                                       f"Nodes: {len(result.graph.nodes):,} | "
-                                       f"ETA: {eta_str}")
-
-                        print(progress_msg)
-
-                        # Notify callback
-                        if progress_callback:
-                            progress_callback(result.files_scanned, len(files_to_scan), progress_msg)
-
-                        last_print_time = current_time
+        # Minimum seconds between progress reports
+        progress_interval = 1.0
 
-            except Exception as e:
-                error_msg = f"Error scanning {file_path}: {str(e)}"
+        # On a terminal, progress redraws one line in place; piped output (logs, the
+        # backend container) keeps one line per report so it stays greppable
+        redraw_progress = sys.stdout.isatty()
+        progress_width = 0
+
+        # Unchanged files are loaded from the per-file graph cache instead of rescanned
+        self._file_graph_cache = self._get_file_graph_cache(repository_path, result.schemas_discovered)
+        cache_hits = 0
+
+        # Scan each file (results arrive in file order, serially or from worker processes)
+        for file_path, file_graph, error, cache_hit in self._scan_files(files_to_scan, result.schemas_discovered):
+            cache_hits += cache_hit
+
+            if error is not None:
+                error_msg = f"Error scanning {file_path}: {error}"
                 result.errors.append(error_msg)
+                if progress_width:
+                    # Move off the in-place progress line before warning
+                    print()
+                    progress_width = 0
                 print(f"⚠️  WARNING: {error_msg}")
-
+                continue
+
+            # No scanner handles this file
+            if file_graph is None:
+                continue
+
+            # Merge file graph into result graph
+            self._merge_graphs(result.graph, file_graph)
+            result.files_scanned += 1
+
+            current_time = time.time()
+
+            # Rate-limit progress reporting; nothing is formatted between ticks
+            if (current_time - last_print_time) >= progress_interval:
+                elapsed = current_time - start_time
+                progress_pct = (result.files_scanned / total_files) * 100
+
+                # Calculate estimated time remaining
+                if result.files_scanned > 0:
+                    avg_time_per_file = elapsed / result.files_scanned
+                    remaining_files = total_files - result.files_scanned
+                    eta_seconds = avg_time_per_file * remaining_files
+                    eta_minutes = int(eta_seconds / 60)
+                    eta_seconds_remainder = int(eta_seconds % 60)
+                    eta_str = f"{eta_minutes}m {eta_seconds_remainder}s"
+                else:
+                    eta_str = "calculating..."
+
+                progress_msg = (f"[{progress_pct:5.1f}%] {result.files_scanned:,}/{total_files:,} files | "
+                               f"Nodes: {len(graph_nodes):,} | "
+                               f"ETA: {eta_str}")
+
+                if redraw_progress:
+                    # Pad over any leftover characters from a longer previous line
+                    sys.stdout.write('\r' + progress_msg.ljust(progress_width))
+                    sys.stdout.flush()
+                    progress_width = len(progress_msg)
+                else:
+                    print(progress_msg)
+
+                # Notify callback
+                if progress_callback:
+                    progress_callback(result.files_scanned, total_files, progress_msg)
+
+                last_print_time = current_time
+
+        if progress_width:
+            # Finish the in-place progress line
+            print()
         print("="*60)
-        print(f"✓ Scanning complete: {result.files_scanned:,} files processed\n")
+        print(f"✓ Scanning complete: {result.files_scanned:,} files processed")
+        if self._file_graph_cache:
+            print(f"  Cache: {cache_hits:,} hits, {result.files_scanned - cache_hits:,} misses")
+        print()
 
         # Notify completion of file scanning
         if progress_callback:
-            progress_callback(len(files_to_scan), len(files_to_scan),
+            progress_callback(total_files, total_files,
                             f"File scanning complete: {result.files_scanned:,} files processed")
 
         # Analyze and create edges based on workflow patterns
@@ -167,9 +298,9 @@ class WorkflowGraphBuilder:
 
             # Notify callback about edge inference phase
             if progress_callback:
-                progress_callback(len(files_to_scan), len(files_to_scan), "Analyzing workflow relationships...")
+                progress_callback(total_files, total_files, "Analyzing workflow relationships...")
 
-            self._infer_workflow_edges(result.graph, edge_inference_config, len(files_to_scan), progress_callback)
+            self._infer_workflow_edges(result.graph, edge_inference_config, total_files, progress_callback)
         else:
             print("\n⚠️  Skipping edge inference (disabled in config)")
 
@@ -179,7 +310,7 @@ class WorkflowGraphBuilder:
         print("="*60)
         try:
             if progress_callback:
-                progress_callback(len(files_to_scan), len(files_to_scan), "Analyzing API routes and endpoints...")
+                progress_callback(total_files, total_files, "Analyzing API routes and endpoints...")
             self._analyze_api_routes(result.graph, progress_callback)
         except Exception as e:
             error_msg = f"API routes analysis failed: {str(e)}"
@@ -192,7 +323,7 @@ class WorkflowGraphBuilder:
         print("="*60)
         try:
             if progress_callback:
-                progress_callback(len(files_to_scan), len(files_to_scan), "Analyzing UI pages and components...")
+                progress_callback(total_files, total_files, "Analyzing UI pages and components...")
             self._analyze_pages_and_components(result.graph, progress_callback)
         except Exception as e:
             error_msg = f"Pages/components analysis failed: {str(e)}"
@@ -205,7 +336,7 @@ class WorkflowGraphBuilder:
         print("="*60)
         try:
             if progress_callback:
-                progress_callback(len(files_to_scan), len(files_to_scan), "Analyzing code dependencies...")
+                progress_callback(total_files, total_files, "Analyzing code dependencies...")
             self._analyze_dependencies(result.graph, progress_callback)
         except Exception as e:
             error_msg = f"Dependency analysis failed: {str(e)}"
@@ -227,69 +358,98 @@ class WorkflowGraphBuilder:
 
         # Final completion message
         if progress_callback:
-            progress_callback(len(files_to_scan), len(files_to_scan), "Scan completed successfully!")
+            progress_callback(total_files, total_files, "Scan completed successfully!")
 
         return result
 
-    def _discover_schemas(self, files_to_scan: List[str], result, progress_callback=None):
+    def _discover_schemas(self, cs_files: List[str], result, progress_callback=None):
         """Discover database schemas/models in the codebase.
 
         This performs a first pass to identify entity/model definitions
         before scanning for workflow operations.
 
         Args:
-            files_to_scan: List of files to check for schemas
+            cs_files: List of C# files to check for schemas (collected during file discovery)
             result: ScanResult to store discovered schemas
             progress_callback: Optional callback for progress updates
         """
-        from scanner import CSharpScanner
-
         # Only scan C# files for schema detection (can extend to TypeScript/etc later)
         csharp_scanner = CSharpScanner(self.config.get('scanner', {}))
         schemas_found = 0
         files_checked = 0
         last_update_time = time.time()
 
-        # Count total C# files for accurate progress
-        total_cs_files = sum(1 for f in files_to_scan if f.endswith('.cs'))
+        # Per-file schema lists from the previous run, keyed by (file_path, content hash)
+        schema_cache_file = self._cache_file(result.repository_path, 'schemas.pkl')
+        schema_cache = self._load_schema_cache(schema_cache_file) if schema_cache_file else {}
+        updated_schema_cache = {}
+        cache_hits = 0
+
+        total_cs_files = len(cs_files)
         print(f"  Scanning {total_cs_files} C# files for database schemas...")
 
-        for file_path in files_to_scan:
-            if file_path.endswith('.cs'):
-                try:
-                    schemas = csharp_scanner.detect_schemas(file_path)
+        def detect(file_path):
+            """Read, hash and parse one file (runs on a pool thread)."""
+            try:
+                if not schema_cache_file:
+                    return file_path, None, csharp_scanner.detect_schemas(file_path), False, None
 
-                    for schema in schemas:
-                        # Store by both entity name and table name for easy lookup
-                        result.schemas_discovered[schema.entity_name] = schema
-                        result.schemas_discovered[schema.table_name] = schema
-                        schemas_found += 1
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                cache_key = (file_path, hashlib.blake2b(data, digest_size=16).hexdigest())
 
-                    files_checked += 1
+                schemas = schema_cache.get(cache_key)
+                if schemas is not None:
+                    return file_path, cache_key, schemas, True, None
+                return file_path, cache_key, csharp_scanner.detect_schemas(file_path, data=data), False, None
+            except Exception as e:
+                return file_path, None, None, False, e
 
-                    current_time = time.time()
+        # File reads dominate, so threads overlap I/O; results are merged here on the main thread
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for file_path, cache_key, schemas, cache_hit, error in executor.map(detect, cs_files):
+                if error is not None:
+                    # Don't fail the entire scan if schema detection fails
+                    print(f"  ⚠️  Warning: Failed to detect schemas in {file_path}: {str(error)}")
+                    continue
 
-                    # Send progress update every 10 files OR every 2 seconds (much more frequent!)
-                    if progress_callback and (files_checked % 10 == 0 or (current_time - last_update_time) >= 2):
-                        progress_pct = (files_checked / total_cs_files * 100) if total_cs_files > 0 else 0
-                        progress_msg = f"Discovering database schemas... ({files_checked}/{total_cs_files} files, {len(result.schemas_discovered):,} schemas found)"
+                if cache_key is not None:
+                    updated_schema_cache[cache_key] = schemas
+                cache_hits += cache_hit
 
-                        # Print to console for debugging
-                        print(f"  [{progress_pct:5.1f}%] {progress_msg}")
+                for schema in schemas:
+                    # Store by both entity name and table name for easy lookup
+                    result.schemas_discovered[schema.entity_name] = schema
+                    result.schemas_discovered[schema.table_name] = schema
+                    schemas_found += 1
 
-                        # Notify frontend
-                        progress_callback(files_checked, total_cs_files, progress_msg)
-                        last_update_time = current_time
+                files_checked += 1
 
-                except Exception as e:
-                    # Don't fail the entire scan if schema detection fails
-                    print(f"  ⚠️  Warning: Failed to detect schemas in {file_path}: {str(e)}")
-                    pass
+                current_time = time.time()
+
+                # Send progress update every 10 files OR every 2 seconds (much more frequent!)
+                if progress_callback and (files_checked % 10 == 0 or (current_time - last_update_time) >= 2):
+                    progress_pct = (files_checked / total_cs_files * 100) if total_cs_files > 0 else 0
+                    progress_msg = f"Discovering database schemas... ({files_checked}/{total_cs_files} files, {len(result.schemas_discovered):,} schemas found)"
+
+                    # Print to console for debugging
+                    print(f"  [{progress_pct:5.1f}%] {progress_msg}")
+
+                    # Notify frontend
+                    progress_callback(files_checked, total_cs_files, progress_msg)
+                    last_update_time = current_time
 
         print(f"  ✓ Checked {files_checked} C# files")
+        if schema_cache_file:
+            print(f"  ✓ Schema cache: {cache_hits:,} hits, {files_checked - cache_hits:,} misses")
+            # Rewrite only when something changed; dropping unseen keys prunes deleted files
+            if updated_schema_cache.keys() != schema_cache.keys():
+                self._save_cache(schema_cache_file, {'version': self.CACHE_VERSION,
+                                                     'entries': updated_schema_cache})
         print(f"  ✓ Discovered {len(result.schemas_discovered)} unique schemas")
 
-    def _find_files(self, root_path: str, include_extensions: List[str], exclude_dirs: List[str]) -> List[str]:
+    def _find_files(self, root_path: str, include_extensions: List[str], exclude_dirs: List[str]) -> tuple:
         """Find all files to scan in the repository.
 
         Args:
@@ -298,13 +458,61 @@ class WorkflowGraphBuilder:
             exclude_dirs: List of directory names to exclude
 
         Returns:
-            List of file paths to scan
+            Tuple of (files to scan, C# files for schema discovery)
         """
-        import fnmatch
+        exclude_patterns = self.config.get('scanner', {}).get('exclude_patterns', [])
 
+        # Reuse the previous walk if no directory it visited has changed
+        cache_file = self._cache_file(root_path, 'filelist.pkl')
+        dir_mtimes = None
+        if cache_file:
+            filters = (tuple(include_extensions), tuple(exclude_dirs), tuple(exclude_patterns))
+            cached = self._load_cache(cache_file)
+            if cached and cached[0] == filters and self._layout_unchanged(cached[1]):
+                print(f"  Using cached file list ({len(cached[2]):,} files, repository layout unchanged)")
+                return [sys.intern(f) for f in cached[2]], [sys.intern(f) for f in cached[3]]
+            dir_mtimes = []
+
+        # Single walk: every match is scanned, C# files also go to schema discovery.
+        # Paths are interned: they key every per-file dict after the scan, and scanners
+        # hand the same object to each CodeLocation they create
         files = []
+        cs_files = []
+        for file_path, ext in self._walk_and_dispatch(root_path, include_extensions, exclude_dirs,
+                                                      dir_mtimes):
+            file_path = sys.intern(file_path)
+            files.append(file_path)
+            if ext == '.cs':
+                cs_files.append(file_path)
+
+        if cache_file:
+            self._save_cache(cache_file, (filters, dir_mtimes, files, cs_files))
+
+        return files, cs_files
+
+    def _walk_and_dispatch(self, root_path: str, include_extensions: List[str], exclude_dirs: List[str],
+                           dir_mtimes: list = None):
+        """Walk the repository and yield files matching the scan filters.
+
+        Args:
+            root_path: Root directory to search
+            include_extensions: List of file extensions to include
+            exclude_dirs: List of directory names to exclude
+            dir_mtimes: Optional list that receives a (directory, mtime_ns) pair
+                for every directory the walk lists (see _layout_unchanged)
+
+        Yields:
+            (file_path, ext) tuples, where ext is the file's final suffix
+        """
         exclude_patterns = self.config.get('scanner', {}).get('exclude_patterns', [])
 
+        # Tuple lets str.endswith test every extension in one call
+        include_extensions = tuple(include_extensions)
+
+        # One compiled regex instead of an fnmatch call per pattern ('(?!)' never matches)
+        exclude_re = re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern))
+                                         for pattern in exclude_patterns) or '(?!)')
+
         # Convert exclude_dirs to a set for O(1) lookup
         exclude_dirs_set = set(exclude_dirs)
 
@@ -312,30 +520,313 @@ class WorkflowGraphBuilder:
         dirs_skipped = 0
         files_excluded_by_pattern = 0
 
-        for root, dirs, filenames in os.walk(root_path):
-            # Remove excluded directories from search (in-place modification to prevent os.walk from descending)
-            original_dir_count = len(dirs)
-            dirs[:] = [d for d in dirs if d not in exclude_dirs_set and not d.startswith('.')]
-            dirs_skipped += original_dir_count - len(dirs)
-
-            for filename in filenames:
-                # Check if file matches any extension
-                if not any(filename.endswith(ext) for ext in include_extensions):
-                    continue
-
-                # Check if file matches any exclude pattern
-                if any(fnmatch.fnmatch(filename, pattern) for pattern in exclude_patterns):
-                    files_excluded_by_pattern += 1
-                    continue
-
-                file_path = os.path.join(root, filename)
-                files.append(file_path)
+        # Explicit scandir stack: DirEntry caches file type, so no extra stat per entry
+        stack = [root_path]
+        while stack:
+            directory = stack.pop()
+            subdirs = []
+            try:
+                if dir_mtimes is not None:
+                    # Stat before listing, so a change made mid-listing shows up next time
+                    dir_mtimes.append((directory, os.stat(directory).st_mtime_ns))
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip excluded and hidden directories
+                            if name in exclude_dirs_set or name.startswith('.'):
+                                dirs_skipped += 1
+                            else:
+                                subdirs.append(entry.path)
+                            continue
+
+                        # Check if file matches any extension
+                        if not name.endswith(include_extensions) or not entry.is_file():
+                            continue
+
+                        # Check if file matches any exclude pattern
+                        if exclude_re.match(os.path.normcase(name)):
+                            files_excluded_by_pattern += 1
+                            continue
+
+                        yield entry.path, os.path.splitext(name)[1]
+            except OSError:
+                # Unreadable directory - skip it like os.walk does
+                continue
+
+            # Reversed so directories are visited in listing order (same as os.walk)
+            stack.extend(reversed(subdirs))
 
         # Report what was filtered out
         if dirs_skipped > 0 or files_excluded_by_pattern > 0:
             print(f"  Filtered: {dirs_skipped} directories, {files_excluded_by_pattern} files (minified/generated)")
 
-        return files
+    def _get_cache_dir(self, root_path: str):
+        """Get the scan cache directory for a repository.
+
+        Args:
+            root_path: Root directory being scanned
+
+        Returns:
+            Cache directory path, or None if caching is disabled
+        """
+        # Opt-in: the cache writes to disk, which a one-off scan doesn't need
+        cache_config = self.config.get('scanner', {}).get('cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+
+        directory = cache_config.get('directory')
+        if directory:
+            # Explicitly configured: relative paths live inside the repository
+            # (dot-prefixed names are skipped by the walk)
+            cache_dir = os.path.join(root_path, directory)
+        else:
+            # Default: outside the scanned tree (which may be read-only), one
+            # directory per repository under the user cache directory
+            cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            repo_key = hashlib.sha256(os.path.abspath(root_path).encode('utf-8')).hexdigest()[:16]
+            cache_dir = os.path.join(cache_home, 'workflow-tracker', repo_key)
+
+        # Probe once, before any worker starts, so an unwritable location costs
+        # one warning rather than one per cache write
+        writable = self._cache_dir_writable.get(cache_dir)
+        if writable is None:
+            writable = self._probe_cache_dir(cache_dir)
+            self._cache_dir_writable[cache_dir] = writable
+        return cache_dir if writable else None
+
+    def _cache_file(self, root_path: str, name: str):
+        """Get the path of a whole-repository cache file (file list, schemas).
+
+        Goes through _get_cache_dir, so these files follow the same opt-in,
+        location and writability rules as the per-file graph cache.
+
+        Args:
+            root_path: Root directory being scanned
+            name: Cache file name
+
+        Returns:
+            Cache file path, or None if caching is disabled or unusable
+        """
+        cache_dir = self._get_cache_dir(root_path)
+        return os.path.join(cache_dir, name) if cache_dir else None
+
+    @staticmethod
+    def _probe_cache_dir(cache_dir: str) -> bool:
+        """Check that a cache directory can be created and written to, warning if not."""
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, probe_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            os.close(fd)
+            os.remove(probe_file)
+            return True
+        except OSError as e:
+            print(f"  ⚠️  Warning: Cache directory {cache_dir} is not writable ({e}); caching disabled for this scan")
+            return False
+
+    @staticmethod
+    def _layout_unchanged(dir_mtimes: list) -> bool:
+        """Check whether a previous walk's directories are all unchanged.
+
+        Adding, removing or renaming an entry updates the mtime of the directory
+        holding it, at any depth, so re-stat-ing each directory the walk listed
+        detects any change to the file list without listing them again.
+
+        Args:
+            dir_mtimes: (directory, mtime_ns) pairs recorded by _walk_and_dispatch
+
+        Returns:
+            True if every directory still exists with the same mtime
+        """
+        try:
+            return all(os.stat(directory).st_mtime_ns == mtime_ns for directory, mtime_ns in dir_mtimes)
+        except OSError:
+            return False
+
+    def _get_file_graph_cache(self, root_path: str, schema_registry: dict):
+        """Set up the persistent per-file graph cache for this scan.
+
+        Entries are keyed by file path and content hash, salted with
+        everything else that affects scanner output: the cache version,
+        the scanner configuration and the discovered schemas.
+
+        Args:
+            root_path: Root directory being scanned
+            schema_registry: Discovered schemas passed through to scanners
+
+        Returns:
+            (cache_directory, salt) tuple, or None if caching is disabled
+        """
+        cache_dir = self._get_cache_dir(root_path)
+        if not cache_dir:
+            return None
+
+        salt_source = json.dumps({
+            'version': self.CACHE_VERSION,
+            'scanner': self.config.get('scanner', {}),
+            'schemas': sorted((name, schema.table_name) for name, schema in schema_registry.items()),
+        }, sort_keys=True, default=str)
+        salt = hashlib.sha256(salt_source.encode('utf-8')).hexdigest()[:16]
+
+        return os.path.join(cache_dir, 'file-graph'), salt
+
+    def _file_graph_cache_path(self, file_path: str, raw: bytes, scanner):
+        """Get the cache entry path for a file's graph.
+
+        Args:
+            file_path: Path to the file
+            raw: File contents (None if too large to pre-read)
+            scanner: Scanner that handles the file
+
+        Returns:
+            Path to the pickled graph, or None if this file can't be cached
+        """
+        if self._file_graph_cache is None or raw is None or not scanner.cacheable:
+            return None
+
+        cache_dir, salt = self._file_graph_cache
+        digest = hashlib.sha256(f"{salt}\0{file_path}\0".encode('utf-8'))
+        digest.update(raw)
+        return os.path.join(cache_dir, digest.hexdigest() + '.pkl')
+
+    def _load_schema_cache(self, cache_file: str) -> dict:
+        """Load cached per-file schema lists, ignoring entries from other cache versions."""
+        cached = self._load_cache(cache_file)
+        if not cached or cached.get('version') != self.CACHE_VERSION:
+            return {}
+        return cached['entries']
+
+    def _load_cache(self, cache_file: str):
+        """Load a pickled cache entry, returning None if missing or unreadable."""
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def _save_cache(self, cache_file: str, data):
+        """Pickle a cache entry. Failures are non-fatal (full disk, etc.): the first
+        one is reported and turns off further cache writes in this process."""
+        if self._cache_write_failed:
+            return
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            # Write-then-rename so concurrent workers never see a partial file
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            self._cache_write_failed = True
+            print(f"  ⚠️  Warning: Failed to write cache {cache_file}: {str(e)}; not writing further cache entries")
+
+    def _scan_files(self, files_to_scan: List[str], schema_registry: dict):
+        """Scan files, fanning out to a process pool for large repositories.
+
+        Results are yielded in the same order as files_to_scan so the merged
+        graph is identical to a serial scan.
+
+        Args:
+            files_to_scan: List of file paths to scan
+            schema_registry: Discovered schemas passed through to scanners
+
+        Yields:
+            (file_path, file_graph, error, cache_hit) tuples - see _scan_single_file
+        """
+        parallel_config = self.config.get('scanner', {}).get('parallel', {})
+        max_workers = parallel_config.get('max_workers') or os.cpu_count() or 1
+
+        if (parallel_config.get('enabled', False) and max_workers > 1
+                and len(files_to_scan) >= self.PARALLEL_MIN_FILES):
+            # About 8 chunks per worker: large enough to amortise IPC per file,
+            # small enough that one slow chunk doesn't leave other workers idle
+            chunksize = max(1, min(64, len(files_to_scan) // (max_workers * 8)))
+            print(f"  Using {max_workers} worker processes ({chunksize} files per task)")
+            # Workers receive config and schemas once, via the initializer, not per task.
+            # They are spawned, not forked: the builder also runs inside the backend's
+            # multi-threaded server process, where forking can copy held locks
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_scan_worker,
+                                     initargs=(self.config, schema_registry,
+                                               self._file_graph_cache)) as executor:
+                yield from executor.map(_scan_in_worker, files_to_scan, chunksize=chunksize)
+            return
+
+        # Serial scan: I/O threads read upcoming files while this thread scans,
+        # keeping at most PREFETCH_FILES reads in flight
+        with ThreadPoolExecutor(max_workers=self.PREFETCH_WORKERS) as executor:
+            pending = deque()
+            files = iter(files_to_scan)
+            while True:
+                for file_path in files:
+                    read = None
+                    if self._get_scanner_for_file(file_path):
+                        read = executor.submit(self._preread_file, file_path)
+                    pending.append((file_path, read))
+                    if len(pending) >= self.PREFETCH_FILES:
+                        break
+                if not pending:
+                    break
+                file_path, read = pending.popleft()
+                yield self._scan_single_file(file_path, schema_registry, read)
+
+    def _scan_single_file(self, file_path: str, schema_registry: dict, prefetched: Future = None) -> tuple:
+        """Scan one file with the matching scanner.
+
+        Args:
+            file_path: Path to the file
+            schema_registry: Discovered schemas passed through to the scanner
+            prefetched: Optional future for _preread_file(file_path), already submitted
+
+        Returns:
+            (file_path, file_graph, error, cache_hit) - file_graph is None when
+            no scanner handles the file or scanning failed; error is the failure
+            message; cache_hit is True if the graph came from the file graph cache
+        """
+        try:
+            # Find appropriate scanner
+            scanner = self._get_scanner_for_file(file_path)
+            if not scanner:
+                return file_path, None, None, False
+
+            if prefetched is not None:
+                raw = prefetched.result()  # re-raises the read's exception, if any
+            else:
+                raw = self._preread_file(file_path)
+
+            cache_path = self._file_graph_cache_path(file_path, raw, scanner)
+            if cache_path:
+                file_graph = self._load_cache(cache_path)
+                if file_graph is not None:
+                    return file_path, file_graph, None, True
+
+            data = None if scanner.prefers_path else raw
+
+            # Pass schema registry to scanner for enhanced table name detection
+            file_graph = scanner.scan_file(file_path, schema_registry=schema_registry, data=data)
+
+            if cache_path:
+                self._save_cache(cache_path, file_graph)
+
+            return file_path, file_graph, None, False
+        except Exception as e:
+            return file_path, None, str(e), False
+
+    def _preread_file(self, file_path: str):
+        """Read a file's raw bytes in one call so the scanner doesn't reopen it.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            File contents as bytes, or None if the file is too large to pre-read
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > self.MAX_PREREAD_BYTES:
+                return None
+            return f.read()
 
     def _get_scanner_for_file(self, file_path: str):
         """Get appropriate scanner for a file.
@@ -346,6 +837,11 @@ class WorkflowGraphBuilder:
         Returns:
             Scanner instance or None
         """
+        scanner = self._scanner_by_ext.get(os.path.splitext(file_path)[1])
+        if scanner is not None:
+            return scanner
+
+        # Extension not claimed outright by one scanner: ask each in priority order
         for scanner in self.scanners:
             if scanner.can_scan(file_path):
                 return scanner
@@ -358,11 +854,8 @@ class WorkflowGraphBuilder:
             target: Target graph to merge into
             source: Source graph to merge from
         """
-        for node in source.nodes:
-            target.add_node(node)
-
-        for edge in source.edges:
-            target.add_edge(edge)
+        # Paths were interned when the nodes' locations were built or unpickled
+        target.extend(source)
 
     def _infer_workflow_edges(self, graph: WorkflowGraph, config: Dict[str, Any] = None,
                              total_files: int = 0, progress_callback = None):
@@ -386,48 +879,47 @@ class WorkflowGraphBuilder:
         if config.get('proximity_edges', True):
             print("  Creating proximity edges...")
             max_distance = config.get('max_line_distance', 20)
-            nodes_by_file = {}
-
-            # Group nodes by file
+            # Group nodes by file (one hashed lookup per node)
+            nodes_by_file = defaultdict(list)
             for node in graph.nodes:
-                file_path = node.location.file_path
-                if file_path not in nodes_by_file:
-                    nodes_by_file[file_path] = []
-                nodes_by_file[file_path].append(node)
+                nodes_by_file[node.location.file_path].append(node)
 
             edge_count = 0
             files_processed = 0
             total_file_count = len(nodes_by_file)
+            new_edges = []
 
             # Create edges within each file based on line number proximity
             for file_path, nodes in nodes_by_file.items():
-                # Sort nodes by line number
-                sorted_nodes = sorted(nodes, key=lambda n: n.location.line_number)
-
-                # Connect adjacent workflow operations
-                for i in range(len(sorted_nodes) - 1):
-                    current = sorted_nodes[i]
-                    next_node = sorted_nodes[i + 1]
-
-                    line_distance = next_node.location.line_number - current.location.line_number
-
-                    if line_distance <= max_distance:
-                        edge = WorkflowEdge(
-                            source=current.id,
-                            target=next_node.id,
-                            label=f"Sequential ({line_distance} lines)",
-                            metadata={'distance': line_distance}
-                        )
-                        graph.add_edge(edge)
-                        edge_count += 1
-
                 files_processed += 1
 
+                # A single node can't have a neighbour
+                if len(nodes) > 1:
+                    # Sort (id, line) pairs by line number so the loop below
+                    # never walks node.location attribute chains
+                    sorted_entries = sorted(((n.id, n.location.line_number) for n in nodes),
+                                            key=itemgetter(1))
+
+                    # Connect adjacent workflow operations (pairwise line deltas)
+                    for (cur_id, cur_line), (nxt_id, nxt_line) in zip(sorted_entries, sorted_entries[1:]):
+                        line_distance = nxt_line - cur_line
+                        if line_distance <= max_distance:
+                            new_edges.append(WorkflowEdge(
+                                source=cur_id,
+                                target=nxt_id,
+                                label=f"Sequential ({line_distance} lines)",
+                                metadata={'distance': line_distance}
+                            ))
+                            edge_count += 1
+
                 # Send progress update every 50 files
                 if progress_callback and files_processed % 50 == 0:
                     progress_msg = f"Creating proximity edges... ({files_processed}/{total_file_count} files, {edge_count:,} edges)"
                     progress_callback(total_files, total_files, progress_msg)
 
+            # Add the whole batch in one call rather than one add_edge per edge
+            graph.add_edges(new_edges)
+
             print(f"    Added {edge_count} proximity edges")
 
             if progress_callback:
@@ -451,70 +943,59 @@ class WorkflowGraphBuilder:
             total_files: Total number of files scanned (for progress calculation)
             progress_callback: Optional callback for progress updates
         """
-        from models import WorkflowType
-        from collections import defaultdict
-        import bisect
-
         print("  Inferring data flow edges...")
 
         if progress_callback:
             progress_callback(total_files, total_files, "Analyzing data flow patterns...")
 
-        # Create a set of existing edges for O(1) lookup
-        existing_edges = {(e.source, e.target) for e in graph.edges}
-
-        # Group nodes by file and type for efficient lookup
-        nodes_by_file_and_type = defaultdict(lambda: defaultdict(list))
-        for node in graph.nodes:
-            nodes_by_file_and_type[node.location.file_path][node.type].append(node)
-
-        # Sort nodes by line number within each file/type for binary search optimization
-        for file_path, types_dict in nodes_by_file_and_type.items():
-            for node_type, nodes in types_dict.items():
-                nodes.sort(key=lambda n: n.location.line_number)
+        # has_edge checks the graph's own (source, target) index, so no pass over
+        # every edge is needed; pairs created here are tracked until add_edges below
+        has_edge = graph.has_edge
+        new_edge_keys = set()
+
+        # Columnar (structure-of-arrays) view: walk each node's attributes once,
+        # then the matching loops below only index flat lists
+        node_ids = []
+        node_lines = []
+
+        # Group node indices by (file, type) for efficient lookup
+        nodes_by_file_and_type = defaultdict(list)
+        for i, node in enumerate(graph.nodes):
+            location = node.location
+            node_ids.append(node.id)
+            node_lines.append(location.line_number)
+            nodes_by_file_and_type[(location.file_path, node.type)].append(i)
+
+        # Sort node indices by line number within each file/type for binary search optimization,
+        # keeping a parallel list of the sorted line numbers so bisect needs no key function
+        line_of = node_lines.__getitem__
+        lines_by_file_and_type = {}
+        for bucket, indices in nodes_by_file_and_type.items():
+            indices.sort(key=line_of)
+            lines_by_file_and_type[bucket] = [node_lines[i] for i in indices]
+
+        # Distinct files, in first-seen order
+        files = list(dict.fromkeys(file_path for file_path, _ in nodes_by_file_and_type))
+
+        # Only files holding both ends of a pattern can produce its edges; filter them up front
+        def files_with(source_type, target_type):
+            return [file_path for file_path in files
+                    if (file_path, source_type) in nodes_by_file_and_type
+                    and (file_path, target_type) in nodes_by_file_and_type]
+
+        ingestion_files = files_with(WorkflowType.API_CALL, WorkflowType.DATABASE_WRITE)
+        processing_files = files_with(WorkflowType.DATABASE_READ, WorkflowType.DATA_TRANSFORM)
 
         total_edge_count = 0
         files_processed = 0
-        total_file_count = len(nodes_by_file_and_type)
+        total_file_count = len(ingestion_files)
+        new_edges = []
 
-        # Pattern: API call followed by DB write (data ingestion)
+        # Pattern: API call followed by DB write (data ingestion) within 50 lines
         edge_count = 0
-        for file_path, types_dict in nodes_by_file_and_type.items():
-            api_calls = types_dict.get(WorkflowType.API_CALL, [])
-            db_writes = types_dict.get(WorkflowType.DATABASE_WRITE, [])
-
-            # OPTIMIZATION: Use sorted list and binary search instead of nested loops
-            for api_node in api_calls:
-                # Find db_writes that are within 50 lines after this API call
-                # Using binary search to find the starting position
-                min_line = api_node.location.line_number
-                max_line = api_node.location.line_number + 50
-
-                # Find first db_write at or after api_node line
-                start_idx = bisect.bisect_left(db_writes, min_line,
-                                              key=lambda n: n.location.line_number)
-
-                # Check only db_writes within range (much faster than checking all)
-                for i in range(start_idx, len(db_writes)):
-                    db_node = db_writes[i]
-
-                    # Early termination: if we're past the range, stop
-                    if db_node.location.line_number > max_line:
-                        break
-
-                    if db_node.location.line_number > min_line:
-                        # Check if edge doesn't already exist (O(1) lookup)
-                        if (api_node.id, db_node.id) not in existing_edges:
-                            edge = WorkflowEdge(
-                                source=api_node.id,
-                                target=db_node.id,
-                                label="Data Ingestion",
-                                metadata={'pattern': 'api_to_db'}
-                            )
-                            graph.add_edge(edge)
-                            existing_edges.add((api_node.id, db_node.id))
-                            edge_count += 1
-                            total_edge_count += 1
+        for file_path in ingestion_files:
+            api_key = (file_path, WorkflowType.API_CALL)
+            db_write_key = (file_path, WorkflowType.DATABASE_WRITE)
 
             files_processed += 1
 
@@ -523,46 +1004,50 @@ class WorkflowGraphBuilder:
                 progress_msg = f"Data flow analysis... ({files_processed}/{total_file_count} files, {total_edge_count:,} edges)"
                 progress_callback(total_files, total_files, progress_msg)
 
+            for api_idx, db_idx in _emit_pattern_edges(
+                    nodes_by_file_and_type[api_key], lines_by_file_and_type[api_key],
+                    nodes_by_file_and_type[db_write_key], lines_by_file_and_type[db_write_key], 50):
+                # Check if edge doesn't already exist (O(1) lookup)
+                edge_key = (node_ids[api_idx], node_ids[db_idx])
+                if edge_key not in new_edge_keys and not has_edge(*edge_key):
+                    new_edges.append(WorkflowEdge(
+                        source=edge_key[0],
+                        target=edge_key[1],
+                        label="Data Ingestion",
+                        metadata={'pattern': 'api_to_db'}
+                    ))
+                    new_edge_keys.add(edge_key)
+                    edge_count += 1
+                    total_edge_count += 1
+
         print(f"    Added {edge_count} data ingestion edges")
 
-        # Pattern: DB read followed by transform
+        # Pattern: DB read followed by transform within 30 lines
         edge_count = 0
-        for file_path, types_dict in nodes_by_file_and_type.items():
-            db_reads = types_dict.get(WorkflowType.DATABASE_READ, [])
-            transforms = types_dict.get(WorkflowType.DATA_TRANSFORM, [])
-
-            # OPTIMIZATION: Use sorted list and binary search
-            for db_node in db_reads:
-                min_line = db_node.location.line_number
-                max_line = db_node.location.line_number + 30
-
-                # Find first transform at or after db_node line
-                start_idx = bisect.bisect_left(transforms, min_line,
-                                              key=lambda n: n.location.line_number)
-
-                # Check only transforms within range
-                for i in range(start_idx, len(transforms)):
-                    transform_node = transforms[i]
-
-                    # Early termination
-                    if transform_node.location.line_number > max_line:
-                        break
-
-                    if transform_node.location.line_number > min_line:
-                        if (db_node.id, transform_node.id) not in existing_edges:
-                            edge = WorkflowEdge(
-                                source=db_node.id,
-                                target=transform_node.id,
-                                label="Data Processing",
-                                metadata={'pattern': 'db_to_transform'}
-                            )
-                            graph.add_edge(edge)
-                            existing_edges.add((db_node.id, transform_node.id))
-                            edge_count += 1
-                            total_edge_count += 1
+        for file_path in processing_files:
+            db_read_key = (file_path, WorkflowType.DATABASE_READ)
+            transform_key = (file_path, WorkflowType.DATA_TRANSFORM)
+
+            for db_idx, transform_idx in _emit_pattern_edges(
+                    nodes_by_file_and_type[db_read_key], lines_by_file_and_type[db_read_key],
+                    nodes_by_file_and_type[transform_key], lines_by_file_and_type[transform_key], 30):
+                edge_key = (node_ids[db_idx], node_ids[transform_idx])
+                if edge_key not in new_edge_keys and not has_edge(*edge_key):
+                    new_edges.append(WorkflowEdge(
+                        source=edge_key[0],
+                        target=edge_key[1],
+                        label="Data Processing",
+                        metadata={'pattern': 'db_to_transform'}
+                    ))
+                    new_edge_keys.add(edge_key)
+                    edge_count += 1
+                    total_edge_count += 1
 
         print(f"    Added {edge_count} data processing edges")
 
+        # Both patterns are deduplicated against the graph and each other; add them in one batch
+        graph.add_edges(new_edges)
+
         if progress_callback:
             progress_msg = f"Data flow analysis complete: {total_edge_count:,} edges created"
             progress_callback(total_files, total_files, progress_msg)
@@ -576,13 +1061,10 @@ class WorkflowGraphBuilder:
         - Frequency of API calls
         - API call patterns
         """
-        from models import WorkflowType
-        from collections import defaultdict
-
         print("  Analyzing API endpoints...")
 
-        # Extract all API-related nodes
-        api_nodes = [node for node in graph.nodes if node.type == WorkflowType.API_CALL]
+        # Extract all API-related nodes (from the graph's per-type index, in graph order)
+        api_nodes = graph.get_nodes_by_type(WorkflowType.API_CALL)
 
         if not api_nodes:
             print("  ✓ No API endpoints found")
@@ -606,10 +1088,10 @@ class WorkflowGraphBuilder:
         print(f"  ✓ Total API calls: {len(api_nodes)}")
 
         # Show top 5 most used endpoints
-        sorted_endpoints = sorted(endpoint_stats.items(), key=lambda x: x[1]["count"], reverse=True)
+        sorted_endpoints = heapq.nlargest(5, endpoint_stats.items(), key=lambda x: x[1]["count"])
         if sorted_endpoints:
             print("  Top API endpoints:")
-            for endpoint, stats in sorted_endpoints[:5]:
+            for endpoint, stats in sorted_endpoints:
                 methods_str = ", ".join(sorted(stats["methods"]))
                 print(f"    • {endpoint} ({methods_str}): {stats['count']} calls in {len(stats['files'])} files")
 
@@ -624,9 +1106,6 @@ class WorkflowGraphBuilder:
         - Component hierarchies
         - Page workflows
         """
-        from models import WorkflowType
-        from collections import defaultdict
-
         print("  Analyzing UI components and pages...")
 
         # Extract all UI-related nodes
@@ -645,18 +1124,12 @@ class WorkflowGraphBuilder:
             file_path = node.location.file_path
             file_components[file_path].append(node)
 
-        # Identify component types
+        # Identify component types by file extension (one dict lookup per node)
+        framework_by_extension = {'tsx': 'React', 'jsx': 'React', 'xaml': 'WPF', 'html': 'Angular'}
         component_types = defaultdict(int)
         for node in ui_nodes:
-            # Categorize by file extension or node type
-            if node.location.file_path.endswith('.tsx') or node.location.file_path.endswith('.jsx'):
-                component_types['React'] += 1
-            elif node.location.file_path.endswith('.xaml'):
-                component_types['WPF'] += 1
-            elif node.location.file_path.endswith('.html'):
-                component_types['Angular'] += 1
-            else:
-                component_types['Other'] += 1
+            extension = node.location.file_path.rsplit('.', 1)[-1]
+            component_types[framework_by_extension.get(extension, 'Other')] += 1
 
         # Report findings
         print(f"  ✓ Found {len(file_components)} component files")
@@ -668,11 +1141,11 @@ class WorkflowGraphBuilder:
                 print(f"    • {comp_type}: {count} interactions")
 
         # Show files with most UI interactions
-        sorted_files = sorted(file_components.items(), key=lambda x: len(x[1]), reverse=True)
+        sorted_files = heapq.nlargest(5, file_components.items(), key=lambda x: len(x[1]))
         if sorted_files:
             print("  Most interactive components:")
-            for file_path, nodes in sorted_files[:5]:
-                file_name = file_path.split('/')[-1]
+            for file_path, nodes in sorted_files:
+                file_name = file_path.rpartition('/')[2]
                 print(f"    • {file_name}: {len(nodes)} interactions")
 
         if progress_callback:
@@ -686,7 +1159,6 @@ class WorkflowGraphBuilder:
         - Highly connected workflow nodes
         - Potential architectural insights
         """
-        from collections import defaultdict
 
         print("  Analyzing code dependencies...")
 
@@ -698,55 +1170,58 @@ class WorkflowGraphBuilder:
             file_path = node.location.file_path
             file_dependencies[file_path]["nodes"] += 1
 
-        # Count edges (dependencies) per file
-        node_to_file = {node.id: node.location.file_path for node in graph.nodes}
+        # Count edges (dependencies) per file, using the graph's node -> file index
+        # (and the cross-file total as they're counted, rather than re-summing afterwards)
+        file_of = graph.file_of
+        total_cross_file_edges = 0
 
         for edge in graph.edges:
-            source_file = node_to_file.get(edge.source)
-            target_file = node_to_file.get(edge.target)
+            source_file = file_of(edge.source)
+            target_file = file_of(edge.target)
 
             if source_file and target_file:
                 if source_file != target_file:
                     # Cross-file dependency
                     file_dependencies[source_file]["outgoing"] += 1
                     file_dependencies[target_file]["incoming"] += 1
+                    total_cross_file_edges += 1
 
         # Report findings
         total_files = len(file_dependencies)
-        total_cross_file_edges = sum(stats["outgoing"] for stats in file_dependencies.values())
 
         print(f"  ✓ Analyzed {total_files} files")
         print(f"  ✓ Found {total_cross_file_edges} cross-file dependencies")
 
         # Find most connected files (hubs)
         if file_dependencies:
-            sorted_by_connections = sorted(
+            # Only the top 5 are shown; nlargest keeps sorted()'s order for ties
+            sorted_by_connections = heapq.nlargest(
+                5,
                 file_dependencies.items(),
-                key=lambda x: x[1]["incoming"] + x[1]["outgoing"],
-                reverse=True
+                key=lambda x: x[1]["incoming"] + x[1]["outgoing"]
             )
 
             if sorted_by_connections:
                 print("  Most connected files (dependency hubs):")
-                for file_path, stats in sorted_by_connections[:5]:
-                    file_name = file_path.split('/')[-1]
+                for file_path, stats in sorted_by_connections:
+                    file_name = file_path.rpartition('/')[2]
                     total_connections = stats["incoming"] + stats["outgoing"]
                     print(f"    • {file_name}: {total_connections} connections "
                           f"({stats['incoming']} in, {stats['outgoing']} out, {stats['nodes']} nodes)")
 
             # Find files with high outgoing dependencies (potential service layers)
-            sorted_by_outgoing = sorted(
+            sorted_by_outgoing = heapq.nlargest(
+                5,
                 file_dependencies.items(),
-                key=lambda x: x[1]["outgoing"],
-                reverse=True
+                key=lambda x: x[1]["outgoing"]
             )
 
             if sorted_by_outgoing and sorted_by_outgoing[0][1]["outgoing"] > 0:
                 print("  Files with most outgoing dependencies (potential service/utility layers):")
-                for file_path, stats in sorted_by_outgoing[:5]:
+                for file_path, stats in sorted_by_outgoing:
                     if stats["outgoing"] == 0:
                         break
-                    file_name = file_path.split('/')[-1]
+                    file_name = file_path.rpartition('/')[2]
                     print(f"    • {file_name}: {stats['outgoing']} outgoing dependencies")
 
         if progress_callback:
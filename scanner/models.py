@@ -1,7 +1,8 @@
 """Data models for workflow tracking."""
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Iterable, Optional, Set
 from enum import Enum
 
 
@@ -19,7 +20,7 @@ class WorkflowType(Enum):
     CACHE_WRITE = "cache_write"
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeLocation:
     """Represents a location in source code."""
     file_path: str
@@ -27,11 +28,21 @@ class CodeLocation:
     column: Optional[int] = None
     end_line: Optional[int] = None
 
+    def __post_init__(self):
+        # Many locations share a few hundred paths (and unpickled copies arrive
+        # from workers and the cache); keep one string object per path
+        if type(self.file_path) is str:
+            self.file_path = sys.intern(self.file_path)
+
     def __str__(self) -> str:
         return f"{self.file_path}:{self.line_number}"
 
+    def __reduce__(self):
+        # Positional args pickle smaller and faster than the default slot state
+        return (CodeLocation, (self.file_path, self.line_number, self.column, self.end_line))
 
-@dataclass
+
+@dataclass(slots=True)
 class WorkflowNode:
     """Represents a single workflow operation."""
     id: str
@@ -57,11 +68,38 @@ class WorkflowNode:
     queue_name: Optional[str] = None
     topic: Optional[str] = None
 
+    # Metadata values drawn from a small vocabulary, repeated on thousands of nodes
+    _INTERNED_METADATA = ('framework', 'library', 'trigger_type', 'component', 'pattern', 'platform',
+                          'window', 'operator')
+
+    def __post_init__(self):
+        # Names and descriptions come from a handful of templates ("DB Query: Users",
+        # "Raw SQL query execution"); share one copy across nodes, including the
+        # unpickled ones coming back from workers and the cache
+        if type(self.name) is str:
+            self.name = sys.intern(self.name)
+        if type(self.description) is str:
+            self.description = sys.intern(self.description)
+        if type(self.method) is str:
+            self.method = sys.intern(self.method)
+        metadata = self.metadata
+        for key in self._INTERNED_METADATA:
+            value = metadata.get(key)
+            if type(value) is str:
+                metadata[key] = sys.intern(value)
+
     def __hash__(self):
         return hash(self.id)
 
+    def __reduce__(self):
+        return (WorkflowNode, (
+            self.id, self.type, self.name, self.description, self.location, self.metadata,
+            self.code_snippet, self.table_name, self.query, self.endpoint, self.method,
+            self.file_path, self.queue_name, self.topic,
+        ))
 
-@dataclass
+
+@dataclass(slots=True)
 class WorkflowEdge:
     """Represents a connection between workflow nodes."""
     source: str  # Node ID
@@ -72,42 +110,117 @@ class WorkflowEdge:
     def __hash__(self):
         return hash((self.source, self.target))
 
+    def __reduce__(self):
+        return (WorkflowEdge, (self.source, self.target, self.label, self.metadata))
 
-@dataclass
+
+@dataclass(slots=True)
 class WorkflowGraph:
     """Represents a complete workflow graph."""
     nodes: List[WorkflowNode] = field(default_factory=list)
     edges: List[WorkflowEdge] = field(default_factory=list)
     metadata: Dict[str, any] = field(default_factory=dict)
 
+    # Lookup indices maintained by add_node/add_edge (not part of equality or repr).
+    # The member sets hash nodes by ID and edges by (source, target) but compare
+    # with full dataclass equality, so they answer exactly what a list `in` check
+    # would, in O(1)
+    _node_members: Set[WorkflowNode] = field(default_factory=set, init=False, repr=False, compare=False)
+    _edge_members: Set[WorkflowEdge] = field(default_factory=set, init=False, repr=False, compare=False)
+    _node_by_id: Dict[str, WorkflowNode] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _node_to_file: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _nodes_by_type: Dict[WorkflowType, List[WorkflowNode]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _edge_set: Set[tuple] = field(default_factory=set, init=False, repr=False, compare=False)
+    _outgoing: Dict[str, List[WorkflowEdge]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _incoming: Dict[str, List[WorkflowEdge]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for node in self.nodes:
+            self._node_members.add(node)
+            self._index_node(node)
+        for edge in self.edges:
+            self._edge_members.add(edge)
+            self._index_edge(edge)
+
+    def __reduce__(self):
+        # Ship plain lists so workers don't pay for the index fields;
+        # the indices are rebuilt by __post_init__ on the other side
+        return (WorkflowGraph, (list(self.nodes), list(self.edges), self.metadata))
+
+    def _index_node(self, node: WorkflowNode):
+        # First node wins for ID lookups (matches a front-to-back scan),
+        # last node wins for file lookups (matches a dict built over nodes)
+        self._node_by_id.setdefault(node.id, node)
+        self._node_to_file[node.id] = node.location.file_path
+        self._nodes_by_type.setdefault(node.type, []).append(node)
+
+    def _index_edge(self, edge: WorkflowEdge):
+        self._edge_set.add((edge.source, edge.target))
+        self._outgoing.setdefault(edge.source, []).append(edge)
+        self._incoming.setdefault(edge.target, []).append(edge)
+
     def add_node(self, node: WorkflowNode):
         """Add a node to the graph."""
-        if node not in self.nodes:
+        if node not in self._node_members:
+            self._node_members.add(node)
             self.nodes.append(node)
+            self._index_node(node)
 
     def add_edge(self, edge: WorkflowEdge):
         """Add an edge to the graph."""
-        if edge not in self.edges:
+        if edge not in self._edge_members:
+            self._edge_members.add(edge)
             self.edges.append(edge)
+            self._index_edge(edge)
+
+    def add_nodes(self, nodes: Iterable[WorkflowNode]):
+        """Add many nodes to the graph at once (same duplicate rules as add_node)."""
+        members = self._node_members
+        append = self.nodes.append
+        for node in nodes:
+            if node not in members:
+                members.add(node)
+                append(node)
+                self._index_node(node)
+
+    def add_edges(self, edges: Iterable[WorkflowEdge]):
+        """Add many edges to the graph at once (same duplicate rules as add_edge)."""
+        members = self._edge_members
+        append = self.edges.append
+        for edge in edges:
+            if edge not in members:
+                members.add(edge)
+                append(edge)
+                self._index_edge(edge)
+
+    def extend(self, other: 'WorkflowGraph'):
+        """Append another graph's nodes and edges, skipping duplicates."""
+        self.add_nodes(other.nodes)
+        self.add_edges(other.edges)
 
     def get_node(self, node_id: str) -> Optional[WorkflowNode]:
         """Get a node by ID."""
-        for node in self.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        return self._node_by_id.get(node_id)
+
+    def file_of(self, node_id: str) -> Optional[str]:
+        """Get the file path a node was found in."""
+        return self._node_to_file.get(node_id)
+
+    def has_edge(self, source: str, target: str) -> bool:
+        """Check whether an edge from source to target exists (any label)."""
+        return (source, target) in self._edge_set
 
     def get_nodes_by_type(self, workflow_type: WorkflowType) -> List[WorkflowNode]:
         """Get all nodes of a specific type."""
-        return [node for node in self.nodes if node.type == workflow_type]
+        return list(self._nodes_by_type.get(workflow_type, ()))
 
     def get_outgoing_edges(self, node_id: str) -> List[WorkflowEdge]:
         """Get all edges going out from a node."""
-        return [edge for edge in self.edges if edge.source == node_id]
+        return list(self._outgoing.get(node_id, ()))
 
     def get_incoming_edges(self, node_id: str) -> List[WorkflowEdge]:
         """Get all edges coming into a node."""
-        return [edge for edge in self.edges if edge.target == node_id]
+        return list(self._incoming.get(node_id, ()))
 
 
 @dataclass
@@ -125,7 +238,7 @@ class TableSchema:
         return hash((self.entity_name, self.table_name))
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResult:
     """Results from scanning a repository."""
     repository_path: str
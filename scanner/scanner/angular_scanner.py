@@ -1,18 +1,80 @@
 """Angular scanner for UI workflow detection."""
 
+import bisect
+import functools
+import os
 import re
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from typing import List, Dict, Any, NamedTuple, Optional
 from pathlib import Path
 
-from .base import BaseScanner
+from .base import BaseScanner, leading_literal, prescan_re
 from models import (
     WorkflowGraph, WorkflowNode, WorkflowEdge, WorkflowType, CodeLocation
 )
 
 
+@functools.lru_cache(maxsize=8192)
+def _component_name_from_path(file_path: str) -> str:
+    """Derive a component name from a file path (cached per path, outside the
+    scanner instance so `self` doesn't become part of the key)."""
+    stem = Path(file_path).stem
+    # Remove .component suffix if present
+    if stem.endswith('.component'):
+        stem = stem[:-10]
+    return stem.replace('-', ' ').title()
+
+
+class _UITrigger(NamedTuple):
+    """An event binding found in a template, kept for workflow building."""
+    trigger_type: str
+    component: str
+    handler: str
+    location: CodeLocation
+    url: Optional[str]
+
+
+class _HTTPCall(NamedTuple):
+    """An HttpClient call found in a component or service, kept for workflow building."""
+    method: str
+    endpoint: str
+    location: CodeLocation
+
+
+# templateUrl: './x.component.html' inside @Component({...})
+_TEMPLATE_URL_RE = re.compile(r'templateUrl\s*:\s*[\'"]([^\'"]+)[\'"]')
+
+
+def _load_template_content(template_path: str) -> Optional[str]:
+    """Read a template file, or return None if it is missing or unreadable.
+
+    One stat replaces the exists() probe, and its mtime/size key the read cache,
+    so a template shared by several components is read once until it changes.
+    """
+    try:
+        stat = os.stat(template_path)
+    except OSError:
+        return None
+    return _read_template(template_path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=4096)
+def _read_template(template_path: str, mtime_ns: int, size: int) -> Optional[str]:
+    try:
+        with open(template_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    except:
+        return None
+
+
 class AngularScanner(BaseScanner):
     """Scanner for Angular/TypeScript UI workflows."""
 
+    file_extensions = ('.ts', '.html', '.component.ts', '.component.html')
+
+    # Component .ts scans also read the companion template file, so results can't be cached by this file's hash alone
+    cacheable = False
+
     # Angular Event Binding Patterns (Angular uses parentheses for events)
     EVENT_HANDLER_PATTERNS = [
         (r'\(click\)\s*=\s*"([^"]+)"', 'ui_click'),           # (click)="handleClick()"
@@ -52,14 +114,45 @@ class AngularScanner(BaseScanner):
         r'this\.router\.navigate\s*\(\s*\[[\'"]([^\'"]+)[\'"]', # this.router.navigate(['/path'])
     ]
 
+    # Compiled once at class creation; the scan loops call these directly instead
+    # of going through re.search's pattern cache for every line. Event and HTTP
+    # patterns are paired with the literal they start with (the text before the
+    # first \s, unescaped), so they are only tried where that literal occurs
+    _EVENT_HANDLER_RES = [(re.compile(pattern), leading_literal(pattern), trigger_type)
+                          for pattern, trigger_type in EVENT_HANDLER_PATTERNS]
+    _HTTP_RES = [(re.compile(pattern), leading_literal(pattern), method) for pattern, method in HTTP_PATTERNS]
+    _COMPONENT_RES = [re.compile(pattern) for pattern in COMPONENT_PATTERNS]
+    _ROUTE_RES = [re.compile(pattern) for pattern in ROUTE_PATTERNS]
+
+    # Literals every EVENT_HANDLER_PATTERNS / HTTP_PATTERNS match starts with (keep in
+    # sync). They are ASCII, so the bytes forms are checked on the raw file before it
+    # is decoded; the str forms find every position a pattern can match in one pass
+    _EVENT_BINDING_LITERAL = r'\((?:click|submit|ngSubmit|change|input|mousedown|keyup)\)'
+    _HTTP_CALL_LITERAL = r'this\.http\.(?:get|post|put|delete|patch)'
+    _EVENT_BINDING_LITERALS = prescan_re.compile(_EVENT_BINDING_LITERAL.encode())
+    _HTTP_CALL_LITERALS = prescan_re.compile(_HTTP_CALL_LITERAL.encode())
+    _EVENT_BINDING_RE = prescan_re.compile(_EVENT_BINDING_LITERAL)
+    _HTTP_CALL_RE = prescan_re.compile(_HTTP_CALL_LITERAL)
+
     def can_scan(self, file_path: str) -> bool:
         """Check if file is an Angular TypeScript or HTML file."""
-        return file_path.endswith(('.ts', '.html', '.component.ts', '.component.html'))
+        return file_path.endswith(self.file_extensions)
 
-    def scan_file(self, file_path: str, schema_registry: dict = None) -> WorkflowGraph:
+    def scan_file(self, file_path: str, schema_registry: dict = None, data: bytes = None) -> WorkflowGraph:
         """Scan Angular file for UI workflows."""
         self.graph = WorkflowGraph()
-        content = self.read_file(file_path)
+        if data is None:
+            data = self.read_file_bytes(file_path)
+
+        # Templates only yield event bindings, and TypeScript files only yield something
+        # for components or HttpClient calls: skip decoding files that can't match
+        if file_path.endswith('.html'):
+            if not self._EVENT_BINDING_LITERALS.search(data):
+                return self.graph
+        elif b'@Component' not in data and not self._HTTP_CALL_LITERALS.search(data):
+            return self.graph
+
+        content = self.read_file(file_path, data)
 
         # Determine file type
         is_template = file_path.endswith('.html')
@@ -98,8 +191,8 @@ class AngularScanner(BaseScanner):
     def _detect_component_name(self, content: str, file_path: str) -> str:
         """Extract component name from TypeScript file."""
         # Try @Component selector
-        for pattern in self.COMPONENT_PATTERNS:
-            match = re.search(pattern, content)
+        for pattern in self._COMPONENT_RES:
+            match = pattern.search(content)
             if match:
                 name = match.group(1)
                 # Clean up selector (remove 'app-' prefix if present)
@@ -112,16 +205,12 @@ class AngularScanner(BaseScanner):
 
     def _detect_component_name_from_path(self, file_path: str) -> str:
         """Extract component name from file path."""
-        stem = Path(file_path).stem
-        # Remove .component suffix if present
-        if stem.endswith('.component'):
-            stem = stem[:-10]
-        return stem.replace('-', ' ').title()
+        return _component_name_from_path(file_path)
 
     def _detect_url(self, content: str) -> Optional[str]:
         """Detect the URL/route this component belongs to."""
-        for pattern in self.ROUTE_PATTERNS:
-            match = re.search(pattern, content)
+        for pattern in self._ROUTE_RES:
+            match = pattern.search(content)
             if match:
                 return match.group(1)
         return None
@@ -129,38 +218,58 @@ class AngularScanner(BaseScanner):
     def _try_load_template(self, ts_file_path: str, ts_content: str) -> Optional[str]:
         """Try to load the associated HTML template file."""
         # Method 1: Check for templateUrl in @Component
-        template_match = re.search(r'templateUrl\s*:\s*[\'"]([^\'"]+)[\'"]', ts_content)
+        template_match = _TEMPLATE_URL_RE.search(ts_content)
         if template_match:
             template_filename = template_match.group(1)
             # Resolve relative path
             ts_dir = Path(ts_file_path).parent
-            template_path = ts_dir / template_filename
-            if template_path.exists():
-                try:
-                    with open(template_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        return f.read()
-                except:
-                    pass
+            template_content = _load_template_content(str(ts_dir / template_filename))
+            if template_content is not None:
+                return template_content
 
         # Method 2: Look for .component.html file with same base name
         base_path = ts_file_path.replace('.component.ts', '.component.html').replace('.ts', '.html')
-        if Path(base_path).exists():
-            try:
-                with open(base_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
-            except:
-                pass
-
+        return _load_template_content(base_path)
+
+    def _literal_hits(self, literal_re, content: str, lines: List[str]) -> Dict[int, Dict[str, List[int]]]:
+        """Locate every `literal_re` match in one pass over the whole content.
+
+        Match offsets are mapped to line numbers through the precomputed line
+        starts. The literals can't overlap one another, so no hit is hidden.
+
+        Returns:
+            {line number: {literal: [column, ...]}} in line order
+        """
+        hits = {}
+        starts = None
+        for match in literal_re.finditer(content):
+            if starts is None:
+                starts = self.line_starts(lines)
+            offset = match.start()
+            i = bisect.bisect_right(starts, offset)
+            hits.setdefault(i, {}).setdefault(match.group(), []).append(offset - starts[i - 1])
+        return hits
+
+    @staticmethod
+    def _match_at(pattern, line: str, positions: Optional[List[int]]):
+        """Equivalent of `pattern.search(line)` for a pattern that starts with a
+        literal found at `positions`: try an anchored match at each, leftmost first."""
+        if positions:
+            for pos in positions:
+                match = pattern.match(line, pos)
+                if match:
+                    return match
         return None
 
-    def _detect_ui_triggers_from_template(self, file_path: str, template_content: str, component: str, url: Optional[str]) -> List:
+    def _detect_ui_triggers_from_template(self, file_path: str, template_content: str, component: str, url: Optional[str]) -> List[_UITrigger]:
         """Find Angular event bindings in HTML template."""
         triggers = []
         lines = template_content.split('\n')
 
-        for i, line in enumerate(lines, 1):
-            for pattern, trigger_type in self.EVENT_HANDLER_PATTERNS:
-                match = re.search(pattern, line)
+        for i, hits in self._literal_hits(self._EVENT_BINDING_RE, template_content, lines).items():
+            line = lines[i - 1]
+            for pattern, literal, trigger_type in self._EVENT_HANDLER_RES:
+                match = self._match_at(pattern, line, hits.get(literal))
                 if match:
                     handler = match.group(1).strip()
                     # Clean up handler name (remove () if present)
@@ -173,7 +282,7 @@ class AngularScanner(BaseScanner):
                         name=f"Angular: {trigger_type.replace('ui_', '').title()}",
                         description=f"Angular event binding in {component}",
                         location=CodeLocation(file_path, i),
-                        code_snippet=self.extract_code_snippet(template_content, i),
+                        code_snippet=self.extract_code_snippet_from_lines(lines, i),
                         metadata={
                             'trigger_type': trigger_type,
                             'component': component,
@@ -186,26 +295,19 @@ class AngularScanner(BaseScanner):
                     self.graph.add_node(trigger_node)
 
                     # Store trigger for later workflow building
-                    class UITrigger:
-                        pass
-                    trigger_obj = UITrigger()
-                    trigger_obj.trigger_type = trigger_type
-                    trigger_obj.component = component
-                    trigger_obj.handler = handler
-                    trigger_obj.location = CodeLocation(file_path, i)
-                    trigger_obj.url = url
-                    triggers.append(trigger_obj)
+                    triggers.append(_UITrigger(trigger_type, component, handler, CodeLocation(file_path, i), url))
 
         return triggers
 
-    def _detect_http_calls(self, file_path: str, content: str) -> List:
+    def _detect_http_calls(self, file_path: str, content: str) -> List[_HTTPCall]:
         """Find Angular HttpClient calls in TypeScript."""
         http_calls = []
         lines = content.split('\n')
 
-        for i, line in enumerate(lines, 1):
-            for pattern, method in self.HTTP_PATTERNS:
-                match = re.search(pattern, line)
+        for i, hits in self._literal_hits(self._HTTP_CALL_RE, content, lines).items():
+            line = lines[i - 1]
+            for pattern, literal, method in self._HTTP_RES:
+                match = self._match_at(pattern, line, hits.get(literal))
                 if match:
                     endpoint = match.group(1)
 
@@ -218,7 +320,7 @@ class AngularScanner(BaseScanner):
                         location=CodeLocation(file_path, i),
                         endpoint=endpoint,
                         method=method,
-                        code_snippet=self.extract_code_snippet(content, i),
+                        code_snippet=self.extract_code_snippet_from_lines(lines, i),
                         metadata={
                             'library': 'HttpClient',
                             'is_frontend_call': True,
@@ -228,44 +330,61 @@ class AngularScanner(BaseScanner):
                     self.graph.add_node(http_node)
 
                     # Store for workflow building
-                    class HTTPCall:
-                        pass
-                    http_call = HTTPCall()
-                    http_call.method = method
-                    http_call.endpoint = endpoint
-                    http_call.location = CodeLocation(file_path, i)
-                    http_calls.append(http_call)
+                    http_calls.append(_HTTPCall(method, endpoint, CodeLocation(file_path, i)))
 
         return http_calls
 
-    def _build_ui_workflows(self, ui_triggers: List, http_calls: List):
+    def _build_ui_workflows(self, ui_triggers: List[_UITrigger], http_calls: List[_HTTPCall]):
         """Build workflow chains connecting UI triggers to HTTP calls."""
+        # Bucket HTTP calls by file: every call in the trigger's own file is linked,
+        # calls in other files only within 100 lines. Other-file buckets keep a
+        # line-sorted copy so the window can be found with bisect
+        calls_by_file = defaultdict(list)
+        for index, http_call in enumerate(http_calls):
+            calls_by_file[http_call.location.file_path].append(index)
+        windows_by_file = {}
+        for call_file, indices in calls_by_file.items():
+            by_line = sorted((http_calls[index].location.line_number, index) for index in indices)
+            windows_by_file[call_file] = ([line for line, _ in by_line], [index for _, index in by_line])
+
         # For each UI trigger, find HTTP calls that are likely related
         for trigger in ui_triggers:
             # Match by handler name (method name in TypeScript)
             handler_name = trigger.handler.split('(')[0]  # Remove any parameters
 
-            # Find HTTP calls within the same file or close proximity
-            for http_call in http_calls:
-                # Calculate line distance
-                line_distance = abs(http_call.location.line_number - trigger.location.line_number)
-
-                # If HTTP call is close to the trigger (within 100 lines in Angular components)
-                # Angular components tend to be larger, so increase proximity range
-                if line_distance <= 100 or trigger.location.file_path == http_call.location.file_path:
-                    # Create edge from UI trigger to HTTP call
-                    trigger_node_id = f"{trigger.location.file_path}:ui_trigger:{trigger.location.line_number}"
-                    http_node_id = f"{http_call.location.file_path}:http:{http_call.location.line_number}"
-
-                    edge = WorkflowEdge(
-                        source=trigger_node_id,
-                        target=http_node_id,
-                        label="Angular Event → HTTP Call",
-                        metadata={
-                            'workflow_type': 'angular_ui_to_api',
-                            'trigger_type': trigger.trigger_type,
-                            'url': trigger.url,
-                            'framework': 'Angular'
-                        }
-                    )
-                    self.graph.add_edge(edge)
+            trigger_file = trigger.location.file_path
+            trigger_line = trigger.location.line_number
+
+            # HTTP calls in the same file always qualify
+            related = list(calls_by_file.get(trigger_file, ()))
+
+            # If HTTP call is close to the trigger (within 100 lines in Angular components)
+            # Angular components tend to be larger, so increase proximity range
+            if len(calls_by_file) > (trigger_file in calls_by_file):
+                for call_file, (lines, indices) in windows_by_file.items():
+                    if call_file != trigger_file:
+                        lo = bisect.bisect_left(lines, trigger_line - 100)
+                        hi = bisect.bisect_right(lines, trigger_line + 100)
+                        related.extend(indices[lo:hi])
+                # Keep edges in the original HTTP call order
+                related.sort()
+
+            for index in related:
+                http_call = http_calls[index]
+
+                # Create edge from UI trigger to HTTP call
+                trigger_node_id = f"{trigger_file}:ui_trigger:{trigger_line}"
+                http_node_id = f"{http_call.location.file_path}:http:{http_call.location.line_number}"
+
+                edge = WorkflowEdge(
+                    source=trigger_node_id,
+                    target=http_node_id,
+                    label="Angular Event → HTTP Call",
+                    metadata={
+                        'workflow_type': 'angular_ui_to_api',
+                        'trigger_type': trigger.trigger_type,
+                        'url': trigger.url,
+                        'framework': 'Angular'
+                    }
+                )
+                self.graph.add_edge(edge)
@@ -1,15 +1,63 @@
 """Base scanner class for code analysis."""
 
+import os
+import re
 from abc import ABC, abstractmethod
-from typing import List, Set
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, Dict, List, Set, Tuple
 from pathlib import Path
 
 from models import WorkflowGraph, WorkflowNode, CodeLocation
 
+# Whole-file prescans (literal-style alternations that only locate candidate lines)
+# run on RE2's linear-time DFA when google-re2 is installed. Patterns compiled with
+# it must mean the same thing to both engines; everything else stays on re
+try:
+    import re2 as prescan_re
+except ImportError:
+    prescan_re = re
+
+# Every character re's \s matches except '\n', spelled out so RE2 (whose \s is
+# ASCII-only) reads it the same way
+_INLINE_WHITESPACE = '[\t\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]'
+
+
+def line_alternation(patterns: List[str], ignore_case: bool = False, engine=re):
+    """Compile a list of patterns into one regex that matches where any of them does.
+
+    `\\s` and negated classes (`[^...]`) are narrowed to exclude newlines, so a
+    match never spans lines: searching a single line behaves as before, and the
+    regex can also run over a whole file (see BaseScanner.matching_lines).
+    Patterns must not use `\\s` inside a character class.
+    """
+    source = '|'.join(f'(?:{pattern})' for pattern in patterns)
+    source = source.replace(r'\s', _INLINE_WHITESPACE).replace('[^', r'[^\n')
+    return engine.compile('(?i)' + source if ignore_case else source)
+
+
+def leading_literal(pattern: str) -> str:
+    """Return the literal text a pattern starts with (everything before its first \\s)."""
+    return re.sub(r'\\(.)', r'\1', pattern.split(r'\s', 1)[0])
+
 
 class BaseScanner(ABC):
     """Abstract base class for language-specific scanners."""
 
+    # Set to True in scanners that must open the file themselves (e.g. to
+    # stream or mmap it) rather than receive pre-read bytes from the builder
+    prefers_path = False
+
+    # Whether scan_file output depends only on the file's own contents, so the
+    # builder may reuse a cached graph when the file is unchanged
+    cacheable = True
+
+    # File name suffixes this scanner handles (used by can_scan and by the
+    # builder's extension -> scanner lookup)
+    file_extensions = ()
+
     def __init__(self, config: dict):
         """Initialize scanner with configuration.
 
@@ -32,34 +80,53 @@ class BaseScanner(ABC):
         pass
 
     @abstractmethod
-    def scan_file(self, file_path: str, schema_registry: dict = None) -> WorkflowGraph:
+    def scan_file(self, file_path: str, schema_registry: dict = None, data: bytes = None) -> WorkflowGraph:
         """Scan a single file and extract workflow information.
 
         Args:
             file_path: Path to the file to scan
             schema_registry: Optional dictionary mapping table/entity names to TableSchema objects
+            data: Optional raw file contents already read by the caller
 
         Returns:
             WorkflowGraph containing discovered workflows
         """
         pass
 
-    def read_file(self, file_path: str) -> str:
+    def read_file(self, file_path: str, data: bytes = None) -> str:
         """Read file contents.
 
         Args:
             file_path: Path to the file
+            data: Optional raw file contents; decoded instead of re-opening the file
 
         Returns:
             File contents as string
         """
+        if data is None:
+            # One binary read plus a one-shot decode skips the text-mode IO stack
+            data = self.read_file_bytes(file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            content = data.decode('utf-8')
         except UnicodeDecodeError:
             # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
+            content = data.decode('latin-1')
+        # Match text-mode universal newlines
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    def read_file_bytes(self, file_path: str) -> bytes:
+        """Read raw file contents without decoding.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            File contents as bytes (decode later with read_file(file_path, data))
+        """
+        with open(file_path, 'rb') as f:
+            return f.read()
 
     def extract_code_snippet(self, content: str, line_number: int, context_lines: int = 2) -> str:
         """Extract a code snippet around a line number.
@@ -72,13 +139,67 @@ class BaseScanner(ABC):
         Returns:
             Code snippet as string
         """
-        lines = content.split('\n')
+        return self.extract_code_snippet_from_lines(content.split('\n'), line_number, context_lines)
+
+    def extract_code_snippet_from_lines(self, lines: List[str], line_number: int, context_lines: int = 2) -> str:
+        """Extract a code snippet from content that has already been split into lines.
+
+        Scanners that walk `content.split('\n')` should pass that list here
+        rather than re-splitting the whole file for every match.
+
+        Args:
+            lines: File content split on '\n'
+            line_number: Target line number (1-indexed)
+            context_lines: Number of lines before/after to include
+
+        Returns:
+            Code snippet as string
+        """
         start = max(0, line_number - context_lines - 1)
         end = min(len(lines), line_number + context_lines)
 
         snippet_lines = lines[start:end]
         return '\n'.join(snippet_lines)
 
+    def line_starts(self, lines: List[str]) -> array:
+        """Compute the offset at which each line starts.
+
+        With `starts = self.line_starts(content.split('\n'))`, the 1-indexed line
+        containing offset `pos` is `bisect.bisect_right(starts, pos)`, so matches
+        from a whole-content `finditer` map to line numbers in O(log N).
+
+        Args:
+            lines: File content split on '\n'
+
+        Returns:
+            Compact array of line start offsets (first entry is 0)
+        """
+        return array('q', accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+
+    def matching_lines(self, regex, content: str, line_starts: array) -> List[int]:
+        """Find the lines a regex matches with one `finditer` over the whole content.
+
+        The regex must not match across a newline; each match is then confined
+        to one line, so the result is exactly the set of lines on which
+        `regex.search(line)` succeeds.
+
+        Args:
+            regex: Compiled pattern that never matches '\n'
+            content: Full file content
+            line_starts: Offsets from line_starts() for the same content
+
+        Returns:
+            Sorted 1-indexed line numbers, each listed once
+        """
+        matched = []
+        last = 0
+        for match in regex.finditer(content):
+            line_number = bisect_right(line_starts, match.start())
+            if line_number != last:
+                matched.append(line_number)
+                last = line_number
+        return matched
+
     def should_detect_type(self, workflow_type: str) -> bool:
         """Check if we should detect a specific workflow type.
 
@@ -109,6 +230,17 @@ class BaseScanner(ABC):
         return file_path
 
 
+# Tree-sitter parsers and compiled queries shared by every TreeSitterScanner
+# instance in the process, keyed by language name
+_PARSER_CACHE: Dict[str, Tuple[Any, Any]] = {}
+_QUERY_CACHE: Dict[Tuple[str, str], Any] = {}
+
+# Recently parsed trees keyed by (language name, path, mtime_ns, size), so a file
+# parsed again for the same language is not re-read or re-parsed until it changes
+_TREE_CACHE: 'OrderedDict[Tuple[str, str, int, int], Any]' = OrderedDict()
+_TREE_CACHE_SIZE = 64
+
+
 class TreeSitterScanner(BaseScanner):
     """Base class for tree-sitter based scanners."""
 
@@ -129,6 +261,11 @@ class TreeSitterScanner(BaseScanner):
         if self._parser is not None:
             return
 
+        cached = _PARSER_CACHE.get(self.language_name)
+        if cached is not None:
+            self._language, self._parser = cached
+            return
+
         try:
             import tree_sitter
             from tree_sitter import Language, Parser
@@ -137,6 +274,7 @@ class TreeSitterScanner(BaseScanner):
             self._language = self._load_language()
             self._parser = Parser()
             self._parser.set_language(self._language)
+            _PARSER_CACHE[self.language_name] = (self._language, self._parser)
         except ImportError:
             raise ImportError(
                 "tree-sitter is required for code parsing. "
@@ -158,8 +296,18 @@ class TreeSitterScanner(BaseScanner):
             Tree-sitter tree object
         """
         self._init_parser()
+        stat = os.stat(file_path)
+        key = (self.language_name, file_path, stat.st_mtime_ns, stat.st_size)
+        tree = _TREE_CACHE.get(key)
+        if tree is not None:
+            _TREE_CACHE.move_to_end(key)
+            return tree
+
         content = self.read_file(file_path)
-        tree = self._parser.parse(bytes(content, 'utf-8'))
+        tree = self._parser.parse(content.encode('utf-8'))
+        _TREE_CACHE[key] = tree
+        if len(_TREE_CACHE) > _TREE_CACHE_SIZE:
+            _TREE_CACHE.popitem(last=False)
         return tree
 
     def query_code(self, tree: any, query_string: str) -> List:
@@ -172,7 +320,11 @@ class TreeSitterScanner(BaseScanner):
         Returns:
             List of query matches
         """
-        from tree_sitter import Query
+        key = (self.language_name, query_string)
+        query = _QUERY_CACHE.get(key)
+        if query is None:
+            from tree_sitter import Query
 
-        query = Query(self._language, query_string)
+            # Query compilation is costly; compile each query once per language
+            query = _QUERY_CACHE[key] = Query(self._language, query_string)
         return query.captures(tree.root_node)
@@ -1,10 +1,10 @@
 """C# code scanner for workflow detection."""
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-from .base import BaseScanner
+from .base import BaseScanner, leading_literal, line_alternation, prescan_re
 from models import (
     WorkflowGraph, WorkflowNode, WorkflowEdge, WorkflowType, CodeLocation, TableSchema
 )
@@ -13,6 +13,8 @@ from models import (
 class CSharpScanner(BaseScanner):
     """Scanner for C# code to detect data workflows."""
 
+    file_extensions = ('.cs',)
+
     # Common Entity Framework patterns
     EF_QUERY_PATTERNS = [
         r'\.Where\s*\(',
@@ -53,78 +55,178 @@ class CSharpScanner(BaseScanner):
         r'FileStream',
     ]
 
+    # Azure Service Bus patterns
+    SERVICE_BUS_PATTERNS = [
+        r'ServiceBusSender',
+        r'ServiceBusReceiver',
+        r'SendMessageAsync',
+        r'ReceiveMessageAsync',
+    ]
+
+    # Raw ADO.NET SQL patterns
+    RAW_SQL_PATTERNS = [
+        r'SqlCommand',
+        r'SqlDataAdapter',
+        r'ExecuteReader',
+        r'ExecuteScalar',
+    ]
+
+    # RabbitMQ patterns
+    RABBITMQ_PATTERNS = [
+        r'IModel\.BasicPublish',
+        r'IModel\.BasicConsume',
+        r'QueueDeclare',
+    ]
+
+    # Compiled once at class creation; the scan loops call these directly instead
+    # of going through re.search's pattern cache for every line. EF patterns keep
+    # their source string for the node metadata
+    _EF_QUERY_RES = [(re.compile(pattern), pattern) for pattern in EF_QUERY_PATTERNS]
+    _EF_WRITE_RES = [(re.compile(pattern), pattern) for pattern in EF_WRITE_PATTERNS]
+
+    # One alternation per pattern family, so a line costs one search instead of one
+    # per pattern. Message queue nodes don't record which pattern hit, so the
+    # alternation decides on its own. EF nodes record the first listed pattern that
+    # matches (not the leftmost match), so for them it only gates the per-pattern loop
+    _EF_QUERY_ANY = line_alternation(EF_QUERY_PATTERNS)
+    _EF_WRITE_ANY = line_alternation(EF_WRITE_PATTERNS)
+    _RAW_SQL_RE = line_alternation(RAW_SQL_PATTERNS)
+    _SERVICE_BUS_RE = line_alternation(SERVICE_BUS_PATTERNS)
+    _RABBITMQ_RE = line_alternation(RABBITMQ_PATTERNS)
+
+    # Whole-file prescans, one per scan phase; only the lines they report are
+    # visited. HTTP and file I/O lines need no further check
+    _DATABASE_RE = line_alternation(EF_QUERY_PATTERNS + EF_WRITE_PATTERNS + RAW_SQL_PATTERNS, engine=prescan_re)
+    _HTTP_RE = line_alternation(HTTP_PATTERNS, engine=prescan_re)
+    _FILE_IO_RE = line_alternation(FILE_IO_PATTERNS, engine=prescan_re)
+    _MESSAGE_QUEUE_RE = line_alternation(SERVICE_BUS_PATTERNS + RABBITMQ_PATTERNS, engine=prescan_re)
+
+    # The ASCII literals the scan patterns start with, matched against the raw
+    # bytes: ASCII survives UTF-8/Latin-1 decoding unchanged, so a file without
+    # any of them is skipped before it is decoded and split
+    _WORKFLOW_LITERALS = prescan_re.compile(b'|'.join(
+        re.escape(leading_literal(pattern)).encode()
+        for pattern in (EF_QUERY_PATTERNS + EF_WRITE_PATTERNS + RAW_SQL_PATTERNS + HTTP_PATTERNS
+                        + FILE_IO_PATTERNS + SERVICE_BUS_PATTERNS + RABBITMQ_PATTERNS)
+    ))
+
+    # [^"]* stops at the first closing quote, exactly as a DOTALL .*? would
+    _SQL_STRING_RE = re.compile(r'"(SELECT|INSERT|UPDATE|DELETE)[^"]*"', re.IGNORECASE)
+    _SQL_KEYWORDS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+    _ENTITY_ACCESS_RE = re.compile(r'DbSet<(\w+)>|_context\.(\w+)|_db\.(\w+)')
+    _ENTITY_VAR_RE = re.compile(r'var\s+\w+\s*=\s*\w+\.(\w+)')
+    _URL_LITERAL_RE = re.compile(r'"(https?://[^"]+|/[^"]*)"')
+    _API_URL_LITERAL_RE = re.compile(r'"(https?://[^"]+|/api/[^"]*)"')
+    # One pattern per method rather than a fused alternation: the first listed
+    # method that appears wins (not the leftmost), and behind the upper() gate in
+    # _extract_http_method usually only one of them runs
+    _HTTP_METHOD_RES = [(method, re.compile(rf'{method}Async|\.{method}\(', re.IGNORECASE))
+                        for method in ('GET', 'POST', 'PUT', 'DELETE', 'PATCH')]
+    _FILE_PATH_LITERAL_RE = re.compile(r'"([^"]*\.[a-zA-Z]{2,4})"')
+    _STRING_LITERAL_RE = re.compile(r'"([^"]+)"')
+    _QUEUE_DECLARATION_RE = re.compile(r'queueName\s*=\s*"([^"]+)"|CreateQueue\("([^"]+)"')
+    _DBCONTEXT_CLASS_RE = line_alternation([r'class\s+\w+\s*:\s*DbContext'])
+    _DBSET_PROPERTY_RE = re.compile(r'DbSet<(\w+)>\s+(\w+)')
+    _TABLE_ATTRIBUTE_RE = re.compile(r'\[Table\("([^"]+)"\)\]')
+    _CLASS_RE = re.compile(r'class\s+(\w+)')
+    _PROPERTY_RE = re.compile(r'public\s+\w+\??(\[\])?\s+(\w+)\s*\{\s*get;')
+    # Literals a line needs for any of the three entity regexes above to match
+    _ENTITY_LITERALS_RE = prescan_re.compile(r'\[Table\("|class|get;')
+
     def can_scan(self, file_path: str) -> bool:
         """Check if file is a C# file."""
-        return file_path.endswith('.cs')
+        return file_path.endswith(self.file_extensions)
 
-    def scan_file(self, file_path: str, schema_registry: dict = None) -> WorkflowGraph:
+    def scan_file(self, file_path: str, schema_registry: dict = None, data: bytes = None) -> WorkflowGraph:
         """Scan C# file for workflow patterns.
 
         Args:
             file_path: Path to the file to scan
             schema_registry: Optional dictionary mapping table/entity names to TableSchema objects
+            data: Optional raw file contents already read by the caller
         """
         self.graph = WorkflowGraph()
         self.schema_registry = schema_registry or {}
-        content = self.read_file(file_path)
+        if data is not None and not self._WORKFLOW_LITERALS.search(data):
+            return self.graph
+
+        # Split once for all phases; each phase runs its regex over the whole content
+        # and maps match offsets back to lines
+        content, lines, line_starts = self._load(file_path, data)
 
         # Scan for different workflow types
         if self.should_detect_type('database'):
-            self._scan_database_operations(file_path, content)
+            self._scan_database_operations(file_path, content, lines, line_starts)
 
         if self.should_detect_type('api_calls'):
-            self._scan_http_calls(file_path, content)
+            self._scan_http_calls(file_path, content, lines, line_starts)
 
         if self.should_detect_type('file_io'):
-            self._scan_file_operations(file_path, content)
+            self._scan_file_operations(file_path, content, lines, line_starts)
 
         if self.should_detect_type('message_queues'):
-            self._scan_message_queues(file_path, content)
+            self._scan_message_queues(file_path, content, lines, line_starts)
 
         return self.graph
 
-    def _scan_database_operations(self, file_path: str, content: str):
-        """Scan for database operations (Entity Framework, ADO.NET, Dapper)."""
+    def _load(self, file_path: str, data: Optional[bytes]) -> tuple:
+        """Return (content, lines, line_starts) for a file.
+
+        Decodes the bytes the caller already read, or reads the file itself.
+        Splitting is on '\n' only: str.splitlines also breaks on form feeds,
+        U+2028 and other separators, which would shift line numbers. The whole
+        text is kept rather than streamed: the phase prescans run over it in
+        one call each, and the lookback helpers index into the line list.
+        """
+        content = self.read_file(file_path, data)
         lines = content.split('\n')
+        return content, lines, self.line_starts(lines)
 
+    def _scan_database_operations(self, file_path: str, content: str, lines: List[str], line_starts):
+        """Scan for database operations (Entity Framework, ADO.NET, Dapper)."""
+        nodes = []
         # Detect EF DbContext queries
-        for i, line in enumerate(lines, 1):
+        for i in self.matching_lines(self._DATABASE_RE, content, line_starts):
+            line = lines[i - 1]
+
             # Database reads
-            for pattern in self.EF_QUERY_PATTERNS:
-                if re.search(pattern, line):
-                    table_name = self._extract_table_name(line, lines, i)
-                    node = WorkflowNode(
-                        id=f"{file_path}:db_read:{i}",
-                        type=WorkflowType.DATABASE_READ,
-                        name=f"DB Query: {table_name or 'Unknown'}",
-                        description=f"Database query operation",
-                        location=CodeLocation(file_path, i),
-                        table_name=table_name,
-                        code_snippet=self.extract_code_snippet(content, i),
-                        metadata={'pattern': pattern}
-                    )
-                    self.graph.add_node(node)
-                    break  # Only add once per line
+            if self._EF_QUERY_ANY.search(line):
+                for regex, pattern in self._EF_QUERY_RES:
+                    if regex.search(line):
+                        table_name = self._extract_table_name(line, lines, i)
+                        node = WorkflowNode(
+                            id=f"{file_path}:db_read:{i}",
+                            type=WorkflowType.DATABASE_READ,
+                            name=f"DB Query: {table_name or 'Unknown'}",
+                            description=f"Database query operation",
+                            location=CodeLocation(file_path, i),
+                            table_name=table_name,
+                            code_snippet=self.extract_code_snippet_from_lines(lines, i),
+                            metadata={'pattern': pattern}
+                        )
+                        nodes.append(node)
+                        break  # Only add once per line
 
             # Database writes
-            for pattern in self.EF_WRITE_PATTERNS:
-                if re.search(pattern, line):
-                    table_name = self._extract_table_name(line, lines, i)
-                    node = WorkflowNode(
-                        id=f"{file_path}:db_write:{i}",
-                        type=WorkflowType.DATABASE_WRITE,
-                        name=f"DB Write: {table_name or 'Unknown'}",
-                        description=f"Database write operation",
-                        location=CodeLocation(file_path, i),
-                        table_name=table_name,
-                        code_snippet=self.extract_code_snippet(content, i),
-                        metadata={'pattern': pattern}
-                    )
-                    self.graph.add_node(node)
-                    break
+            if self._EF_WRITE_ANY.search(line):
+                for regex, pattern in self._EF_WRITE_RES:
+                    if regex.search(line):
+                        table_name = self._extract_table_name(line, lines, i)
+                        node = WorkflowNode(
+                            id=f"{file_path}:db_write:{i}",
+                            type=WorkflowType.DATABASE_WRITE,
+                            name=f"DB Write: {table_name or 'Unknown'}",
+                            description=f"Database write operation",
+                            location=CodeLocation(file_path, i),
+                            table_name=table_name,
+                            code_snippet=self.extract_code_snippet_from_lines(lines, i),
+                            metadata={'pattern': pattern}
+                        )
+                        nodes.append(node)
+                        break
 
             # Raw SQL queries
-            if re.search(r'SqlCommand|SqlDataAdapter|ExecuteReader|ExecuteScalar', line):
+            if self._RAW_SQL_RE.search(line):
                 query = self._extract_sql_query(lines, i)
                 node = WorkflowNode(
                     id=f"{file_path}:sql:{i}",
@@ -133,112 +235,96 @@ class CSharpScanner(BaseScanner):
                     description="Raw SQL query execution",
                     location=CodeLocation(file_path, i),
                     query=query,
-                    code_snippet=self.extract_code_snippet(content, i),
+                    code_snippet=self.extract_code_snippet_from_lines(lines, i),
                 )
-                self.graph.add_node(node)
+                nodes.append(node)
+
+        self.graph.add_nodes(nodes)
 
-    def _scan_http_calls(self, file_path: str, content: str):
+    def _scan_http_calls(self, file_path: str, content: str, lines: List[str], line_starts):
         """Scan for HTTP/API calls."""
-        lines = content.split('\n')
+        nodes = []
+        for i in self.matching_lines(self._HTTP_RE, content, line_starts):
+            line = lines[i - 1]
+            endpoint = self._extract_endpoint(line, lines, i)
+            method = self._extract_http_method(line)
+
+            node = WorkflowNode(
+                id=f"{file_path}:api:{i}",
+                type=WorkflowType.API_CALL,
+                name=f"API Call: {method or 'HTTP'}",
+                description=f"HTTP API call",
+                location=CodeLocation(file_path, i),
+                endpoint=endpoint,
+                method=method,
+                code_snippet=self.extract_code_snippet_from_lines(lines, i),
+            )
+            nodes.append(node)
 
-        for i, line in enumerate(lines, 1):
-            for pattern in self.HTTP_PATTERNS:
-                if re.search(pattern, line):
-                    endpoint = self._extract_endpoint(line, lines, i)
-                    method = self._extract_http_method(line)
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:api:{i}",
-                        type=WorkflowType.API_CALL,
-                        name=f"API Call: {method or 'HTTP'}",
-                        description=f"HTTP API call",
-                        location=CodeLocation(file_path, i),
-                        endpoint=endpoint,
-                        method=method,
-                        code_snippet=self.extract_code_snippet(content, i),
-                    )
-                    self.graph.add_node(node)
-                    break
+        self.graph.add_nodes(nodes)
 
-    def _scan_file_operations(self, file_path: str, content: str):
+    def _scan_file_operations(self, file_path: str, content: str, lines: List[str], line_starts):
         """Scan for file I/O operations."""
-        lines = content.split('\n')
+        nodes = []
+        for i in self.matching_lines(self._FILE_IO_RE, content, line_starts):
+            line = lines[i - 1]
+            is_read = 'Read' in line  # also covers 'Reader'
+            file_target = self._extract_file_path(line)
+
+            node = WorkflowNode(
+                id=f"{file_path}:file:{i}",
+                type=WorkflowType.FILE_READ if is_read else WorkflowType.FILE_WRITE,
+                name=f"File {'Read' if is_read else 'Write'}",
+                description=f"File {'read' if is_read else 'write'} operation",
+                location=CodeLocation(file_path, i),
+                file_path=file_target,
+                code_snippet=self.extract_code_snippet_from_lines(lines, i),
+            )
+            nodes.append(node)
 
-        for i, line in enumerate(lines, 1):
-            for pattern in self.FILE_IO_PATTERNS:
-                if re.search(pattern, line):
-                    is_read = bool(re.search(r'Read|Reader', line))
-                    file_target = self._extract_file_path(line)
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:file:{i}",
-                        type=WorkflowType.FILE_READ if is_read else WorkflowType.FILE_WRITE,
-                        name=f"File {'Read' if is_read else 'Write'}",
-                        description=f"File {'read' if is_read else 'write'} operation",
-                        location=CodeLocation(file_path, i),
-                        file_path=file_target,
-                        code_snippet=self.extract_code_snippet(content, i),
-                    )
-                    self.graph.add_node(node)
-                    break
+        self.graph.add_nodes(nodes)
 
-    def _scan_message_queues(self, file_path: str, content: str):
+    def _scan_message_queues(self, file_path: str, content: str, lines: List[str], line_starts):
         """Scan for message queue operations (Azure Service Bus, RabbitMQ, etc.)."""
-        lines = content.split('\n')
+        nodes = []
+        for i in self.matching_lines(self._MESSAGE_QUEUE_RE, content, line_starts):
+            line = lines[i - 1]
 
-        # Azure Service Bus patterns
-        service_bus_patterns = [
-            r'ServiceBusSender',
-            r'ServiceBusReceiver',
-            r'SendMessageAsync',
-            r'ReceiveMessageAsync',
-        ]
-
-        # RabbitMQ patterns
-        rabbitmq_patterns = [
-            r'IModel\.BasicPublish',
-            r'IModel\.BasicConsume',
-            r'QueueDeclare',
-        ]
-
-        for i, line in enumerate(lines, 1):
             # Azure Service Bus
-            for pattern in service_bus_patterns:
-                if re.search(pattern, line):
-                    is_send = bool(re.search(r'Send|Sender', line))
-                    queue_name = self._extract_queue_name(line, lines, i)
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:msg:{i}",
-                        type=WorkflowType.MESSAGE_SEND if is_send else WorkflowType.MESSAGE_RECEIVE,
-                        name=f"Message {'Send' if is_send else 'Receive'}",
-                        description=f"Azure Service Bus message operation",
-                        location=CodeLocation(file_path, i),
-                        queue_name=queue_name,
-                        code_snippet=self.extract_code_snippet(content, i),
-                        metadata={'platform': 'Azure Service Bus'}
-                    )
-                    self.graph.add_node(node)
-                    break
+            if self._SERVICE_BUS_RE.search(line):
+                is_send = 'Send' in line  # also covers 'Sender'
+                queue_name = self._extract_queue_name(line, lines, i)
+
+                node = WorkflowNode(
+                    id=f"{file_path}:msg:{i}",
+                    type=WorkflowType.MESSAGE_SEND if is_send else WorkflowType.MESSAGE_RECEIVE,
+                    name=f"Message {'Send' if is_send else 'Receive'}",
+                    description=f"Azure Service Bus message operation",
+                    location=CodeLocation(file_path, i),
+                    queue_name=queue_name,
+                    code_snippet=self.extract_code_snippet_from_lines(lines, i),
+                    metadata={'platform': 'Azure Service Bus'}
+                )
+                nodes.append(node)
 
             # RabbitMQ
-            for pattern in rabbitmq_patterns:
-                if re.search(pattern, line):
-                    is_publish = bool(re.search(r'Publish', line))
-                    queue_name = self._extract_queue_name(line, lines, i)
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:msg:{i}",
-                        type=WorkflowType.MESSAGE_SEND if is_publish else WorkflowType.MESSAGE_RECEIVE,
-                        name=f"Message {'Publish' if is_publish else 'Consume'}",
-                        description=f"RabbitMQ message operation",
-                        location=CodeLocation(file_path, i),
-                        queue_name=queue_name,
-                        code_snippet=self.extract_code_snippet(content, i),
-                        metadata={'platform': 'RabbitMQ'}
-                    )
-                    self.graph.add_node(node)
-                    break
+            if self._RABBITMQ_RE.search(line):
+                is_publish = 'Publish' in line
+                queue_name = self._extract_queue_name(line, lines, i)
+
+                node = WorkflowNode(
+                    id=f"{file_path}:msg:{i}",
+                    type=WorkflowType.MESSAGE_SEND if is_publish else WorkflowType.MESSAGE_RECEIVE,
+                    name=f"Message {'Publish' if is_publish else 'Consume'}",
+                    description=f"RabbitMQ message operation",
+                    location=CodeLocation(file_path, i),
+                    queue_name=queue_name,
+                    code_snippet=self.extract_code_snippet_from_lines(lines, i),
+                    metadata={'platform': 'RabbitMQ'}
+                )
+                nodes.append(node)
+
+        self.graph.add_nodes(nodes)
 
     def _extract_table_name(self, line: str, all_lines: List[str], line_num: int) -> str:
         """Extract table/entity name from EF query.
@@ -248,14 +334,14 @@ class CSharpScanner(BaseScanner):
         entity_name = None
 
         # Look for DbSet<EntityName> or _context.EntityName or _db.EntityName
-        match = re.search(r'DbSet<(\w+)>|_context\.(\w+)|_db\.(\w+)', line)
+        match = self._ENTITY_ACCESS_RE.search(line)
         if match:
             entity_name = match.group(1) or match.group(2) or match.group(3)
 
         # Look backwards for context if not found yet
         if not entity_name:
             for i in range(max(0, line_num - 5), line_num):
-                match = re.search(r'var\s+\w+\s*=\s*\w+\.(\w+)', all_lines[i])
+                match = self._ENTITY_VAR_RE.search(all_lines[i])
                 if match:
                     entity_name = match.group(1)
                     break
@@ -274,7 +360,12 @@ class CSharpScanner(BaseScanner):
         """Extract SQL query string from code."""
         # Look for string literals containing SQL keywords
         context = '\n'.join(lines[max(0, line_num-3):min(len(lines), line_num+3)])
-        match = re.search(r'"(SELECT|INSERT|UPDATE|DELETE).*?"', context, re.IGNORECASE | re.DOTALL)
+        # Anything IGNORECASE matches upper-cases to the keyword, except U+0130
+        # (matches 'i' but upper-cases to itself)
+        upper = context.upper()
+        if not any(keyword in upper for keyword in self._SQL_KEYWORDS) and '\u0130' not in context:
+            return None
+        match = self._SQL_STRING_RE.search(context)
         if match:
             return match.group(0)
         return None
@@ -282,13 +373,13 @@ class CSharpScanner(BaseScanner):
     def _extract_endpoint(self, line: str, all_lines: List[str], line_num: int) -> str:
         """Extract API endpoint from HTTP call."""
         # Look for URL in string literals
-        url_match = re.search(r'"(https?://[^"]+|/[^"]*)"', line)
+        url_match = self._URL_LITERAL_RE.search(line)
         if url_match:
             return url_match.group(1)
 
         # Look for URL in variable assignment nearby
         for i in range(max(0, line_num - 3), min(len(all_lines), line_num + 1)):
-            url_match = re.search(r'"(https?://[^"]+|/api/[^"]*)"', all_lines[i])
+            url_match = self._API_URL_LITERAL_RE.search(all_lines[i])
             if url_match:
                 return url_match.group(1)
 
@@ -296,16 +387,18 @@ class CSharpScanner(BaseScanner):
 
     def _extract_http_method(self, line: str) -> str:
         """Extract HTTP method from call."""
-        methods = ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']
-        for method in methods:
-            if re.search(rf'{method}Async|\.{method}\(', line, re.IGNORECASE):
+        # Uppercasing maps every character the case-insensitive patterns accept onto
+        # the method's letters, so a method missing from `upper` can't match
+        upper = line.upper()
+        for method, pattern in self._HTTP_METHOD_RES:
+            if method in upper and pattern.search(line):
                 return method
         return 'HTTP'
 
     def _extract_file_path(self, line: str) -> str:
         """Extract file path from file operation."""
         # Look for string literals that look like file paths
-        match = re.search(r'"([^"]*\.[a-zA-Z]{2,4})"', line)
+        match = self._FILE_PATH_LITERAL_RE.search(line)
         if match:
             return match.group(1)
         return None
@@ -313,19 +406,19 @@ class CSharpScanner(BaseScanner):
     def _extract_queue_name(self, line: str, all_lines: List[str], line_num: int) -> str:
         """Extract queue/topic name from message queue operation."""
         # Look for string literals
-        match = re.search(r'"([^"]+)"', line)
+        match = self._STRING_LITERAL_RE.search(line)
         if match:
             return match.group(1)
 
         # Look nearby for queue declarations
         for i in range(max(0, line_num - 5), min(len(all_lines), line_num + 1)):
-            match = re.search(r'queueName\s*=\s*"([^"]+)"|CreateQueue\("([^"]+)"', all_lines[i])
+            match = self._QUEUE_DECLARATION_RE.search(all_lines[i])
             if match:
                 return match.group(1) or match.group(2)
 
         return None
 
-    def detect_schemas(self, file_path: str) -> List[TableSchema]:
+    def detect_schemas(self, file_path: str, data: bytes = None) -> List[TableSchema]:
         """Detect database table/entity schemas in C# files.
 
         This identifies:
@@ -335,38 +428,47 @@ class CSharpScanner(BaseScanner):
 
         Args:
             file_path: Path to the C# file
+            data: Optional raw file contents already read by the caller
 
         Returns:
             List of TableSchema objects found in the file
         """
         schemas = []
-        content = self.read_file(file_path)
-        lines = content.split('\n')
+        content, lines, line_starts = self._load(file_path, data)
 
         # Detect DbContext and its DbSet properties
-        dbsets = self._detect_dbsets(file_path, lines)
+        dbsets = self._detect_dbsets(file_path, content, lines, line_starts)
         schemas.extend(dbsets)
 
         # Detect Entity classes (with [Table] attribute or typical entity patterns)
-        entities = self._detect_entity_classes(file_path, lines)
+        entities = self._detect_entity_classes(file_path, content, lines, line_starts)
         schemas.extend(entities)
 
         return schemas
 
-    def _detect_dbsets(self, file_path: str, lines: List[str]) -> List[TableSchema]:
+    def _detect_dbsets(self, file_path: str, content: str, lines: List[str], line_starts) -> List[TableSchema]:
         """Detect DbSet properties in DbContext classes."""
         schemas = []
-        in_dbcontext = False
+        if 'DbContext' not in content or 'DbSet<' not in content:
+            return schemas
+
+        # Outside a DbContext class only the class declaration matters, so jump
+        # from one declaration to the next and walk lines only inside the class
+        walked_to = 0
 
-        for i, line in enumerate(lines, 1):
-            # Detect DbContext class
-            if re.search(r'class\s+\w+\s*:\s*DbContext', line):
-                in_dbcontext = True
+        for start in self.matching_lines(self._DBCONTEXT_CLASS_RE, content, line_starts):
+            if start <= walked_to:
                 continue
 
-            # Look for DbSet<EntityName> PropertyName
-            if in_dbcontext:
-                dbset_match = re.search(r'DbSet<(\w+)>\s+(\w+)', line)
+            walked_to = len(lines)
+            for i in range(start + 1, len(lines) + 1):
+                line = lines[i - 1]
+                # A nested DbContext declaration keeps us inside
+                if self._DBCONTEXT_CLASS_RE.search(line):
+                    continue
+
+                # Look for DbSet<EntityName> PropertyName
+                dbset_match = self._DBSET_PROPERTY_RE.search(line)
                 if dbset_match:
                     entity_name = dbset_match.group(1)
                     dbset_property = dbset_match.group(2)
@@ -384,29 +486,36 @@ class CSharpScanner(BaseScanner):
                     )
                     schemas.append(schema)
 
-            # Exit DbContext when we hit the closing brace (simplified)
-            if in_dbcontext and line.strip() == '}':
-                in_dbcontext = False
+                # Exit DbContext when we hit the closing brace (simplified)
+                if line.strip() == '}':
+                    walked_to = i
+                    break
 
         return schemas
 
-    def _detect_entity_classes(self, file_path: str, lines: List[str]) -> List[TableSchema]:
+    def _detect_entity_classes(self, file_path: str, content: str, lines: List[str], line_starts) -> List[TableSchema]:
         """Detect Entity Framework entity classes."""
         schemas = []
+        # Interfaces, enums, records: nothing to track without a class
+        if 'class' not in content:
+            return schemas
+
         current_class = None
         current_line = 0
         table_attribute = None
         properties = []
 
-        for i, line in enumerate(lines, 1):
+        # Lines without any of the literals leave the state untouched
+        for i in self.matching_lines(self._ENTITY_LITERALS_RE, content, line_starts):
+            line = lines[i - 1]
             # Look for [Table("TableName")] attribute
-            table_match = re.search(r'\[Table\("([^"]+)"\)\]', line)
+            table_match = self._TABLE_ATTRIBUTE_RE.search(line)
             if table_match:
                 table_attribute = table_match.group(1)
                 continue
 
             # Detect class definition
-            class_match = re.search(r'class\s+(\w+)', line)
+            class_match = self._CLASS_RE.search(line)
             if class_match:
                 # Save previous class if it looks like an entity
                 if current_class and self._looks_like_entity(properties):
@@ -429,7 +538,7 @@ class CSharpScanner(BaseScanner):
 
             # Detect properties (simplified: public Type PropName { get; set; })
             if current_class:
-                prop_match = re.search(r'public\s+\w+\??(\[\])?\s+(\w+)\s*\{\s*get;', line)
+                prop_match = self._PROPERTY_RE.search(line)
                 if prop_match:
                     prop_name = prop_match.group(2)
                     properties.append(prop_name)
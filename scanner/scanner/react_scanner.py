@@ -1,10 +1,11 @@
 """React/TypeScript scanner for UI workflow detection."""
 
+import bisect
 import re
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-from .base import BaseScanner
+from .base import BaseScanner, leading_literal, prescan_re
 from models import (
     WorkflowGraph, WorkflowNode, WorkflowEdge, WorkflowType, CodeLocation
 )
@@ -31,12 +32,15 @@ class HTTPCall:
 class ReactScanner(BaseScanner):
     """Scanner for React/Next.js/TypeScript UI workflows."""
 
-    # UI Event Handler Patterns
+    file_extensions = ('.tsx', '.ts', '.jsx', '.js')
+
+    # UI Event Handler Patterns (possessive ++: the handler text can only end at
+    # the first '}', so giving characters back never helps a match)
     EVENT_HANDLER_PATTERNS = [
-        (r'onClick\s*=\s*\{([^\}]+)\}', 'ui_click'),           # onClick={handleClick}
-        (r'onSubmit\s*=\s*\{([^\}]+)\}', 'ui_submit'),         # onSubmit={handleSubmit}
-        (r'onChange\s*=\s*\{([^\}]+)\}', 'ui_change'),         # onChange={handleChange}
-        (r'onLoad\s*=\s*\{([^\}]+)\}', 'page_load'),           # onLoad={handleLoad}
+        (r'onClick\s*=\s*\{([^\}]++)\}', 'ui_click'),          # onClick={handleClick}
+        (r'onSubmit\s*=\s*\{([^\}]++)\}', 'ui_submit'),        # onSubmit={handleSubmit}
+        (r'onChange\s*=\s*\{([^\}]++)\}', 'ui_change'),        # onChange={handleChange}
+        (r'onLoad\s*=\s*\{([^\}]++)\}', 'page_load'),          # onLoad={handleLoad}
     ]
 
     # HTTP Call Patterns
@@ -60,26 +64,50 @@ class ReactScanner(BaseScanner):
         r'href\s*=\s*[\'"]([^\'"]+)[\'"]',
     ]
 
+    # Compiled once at class creation; the scan loops call these directly instead
+    # of going through re.search's pattern cache for every line
+    # Handler patterns carry their leading literal (onClick, ...) so a line only
+    # runs the patterns whose event name it contains
+    _EVENT_HANDLER_RES = [(re.compile(pattern), trigger_type, leading_literal(pattern))
+                          for pattern, trigger_type in EVENT_HANDLER_PATTERNS]
+    _HTTP_RES = [(re.compile(pattern, re.IGNORECASE), lib_type) for pattern, lib_type in HTTP_PATTERNS]
+    _COMPONENT_RES = [re.compile(pattern) for pattern in COMPONENT_PATTERNS]
+    _ROUTE_RES = [re.compile(pattern) for pattern in ROUTE_PATTERNS]
+
+    # Literals every EVENT_HANDLER_PATTERNS / HTTP_PATTERNS match contains (keep in
+    # sync). One finditer over the whole file finds the lines that contain them;
+    # only those lines run the per-pattern loop, where every pattern that matches
+    # yields its own node
+    _EVENT_HANDLER_LITERALS = prescan_re.compile(r'onClick|onSubmit|onChange|onLoad')
+    # The dotted and dotless i are spelled out: Python's IGNORECASE folds them
+    # into 'i', RE2's doesn't
+    _HTTP_LITERALS = prescan_re.compile('(?i)fetch|ax[i\u0130\u0131]os\\.|http\\.')
+    # Each HTTP pattern's literal, upper-cased. Every character IGNORECASE lets
+    # through upper-cases onto these letters (U+0130 aside, which matches 'i'
+    # but upper-cases to itself), so a literal missing from line.upper() rules
+    # its pattern out without a case-insensitive search
+    _HTTP_UPPER_LITERALS = {'fetch': 'FETCH', 'axios': 'AXIOS.', 'http': 'HTTP.'}
+    _FETCH_METHOD_RE = re.compile(r'method\s*:\s*[\'"](\w+)[\'"]', re.IGNORECASE)
+
     def can_scan(self, file_path: str) -> bool:
         """Check if file is a React/TypeScript file."""
-        return file_path.endswith(('.tsx', '.ts', '.jsx', '.js'))
+        return file_path.endswith(self.file_extensions)
 
-    def scan_file(self, file_path: str, schema_registry: dict = None) -> WorkflowGraph:
+    def scan_file(self, file_path: str, schema_registry: dict = None, data: bytes = None) -> WorkflowGraph:
         """Scan React/TypeScript file for UI workflows."""
         self.graph = WorkflowGraph()
-        content = self.read_file(file_path)
+        content = self.read_file(file_path, data)
 
-        # Detect component name
-        component_name = self._detect_component_name(file_path, content)
-
-        # Detect URL/route
-        url = self._detect_url(content)
+        # Split once for both detectors; each finds its candidate lines in one pass
+        # over the content and maps match offsets back to lines
+        lines = content.split('\n')
+        line_starts = self.line_starts(lines)
 
         # Detect UI event handlers (triggers)
-        ui_triggers = self._detect_ui_triggers(file_path, content, component_name, url)
+        ui_triggers = self._detect_ui_triggers(file_path, content, lines, line_starts)
 
         # Detect HTTP calls
-        http_calls = self._detect_http_calls(file_path, content)
+        http_calls = self._detect_http_calls(file_path, content, lines, line_starts)
 
         # Build workflow chains: UI trigger → HTTP call → (backend will be matched later)
         self._build_ui_workflows(ui_triggers, http_calls)
@@ -89,8 +117,8 @@ class ReactScanner(BaseScanner):
     def _detect_component_name(self, file_path: str, content: str) -> str:
         """Extract component name from file."""
         # Try to get from export
-        for pattern in self.COMPONENT_PATTERNS:
-            match = re.search(pattern, content)
+        for pattern in self._COMPONENT_RES:
+            match = pattern.search(content)
             if match:
                 return match.group(1)
 
@@ -99,20 +127,32 @@ class ReactScanner(BaseScanner):
 
     def _detect_url(self, content: str) -> Optional[str]:
         """Detect the URL/route this component belongs to."""
-        for pattern in self.ROUTE_PATTERNS:
-            match = re.search(pattern, content)
+        for pattern in self._ROUTE_RES:
+            match = pattern.search(content)
             if match:
                 return match.group(1)
         return None
 
-    def _detect_ui_triggers(self, file_path: str, content: str, component: str, url: Optional[str]) -> List[UITrigger]:
+    def _detect_ui_triggers(self, file_path: str, content: str, lines: List[str], line_starts) -> List[UITrigger]:
         """Find UI event handlers (onClick, onSubmit, etc.)."""
         triggers = []
-        lines = content.split('\n')
+        nodes = []
+
+        candidate_lines = self.matching_lines(self._EVENT_HANDLER_LITERALS, content, line_starts)
+        if not candidate_lines:
+            return triggers
 
-        for i, line in enumerate(lines, 1):
-            for pattern, trigger_type in self.EVENT_HANDLER_PATTERNS:
-                match = re.search(pattern, line)
+        # The component name and URL only label triggers; their whole-file
+        # searches are skipped for files without any
+        component = self._detect_component_name(file_path, content)
+        url = self._detect_url(content)
+
+        for i in candidate_lines:
+            line = lines[i - 1]
+            for pattern, trigger_type, literal in self._EVENT_HANDLER_RES:
+                if literal not in line:
+                    continue
+                match = pattern.search(line)
                 if match:
                     handler = match.group(1).strip()
                     # Clean up handler name (remove () if present)
@@ -134,7 +174,7 @@ class ReactScanner(BaseScanner):
                         name=f"UI: {trigger_type.replace('ui_', '').title()}",
                         description=f"User interaction in {component}",
                         location=CodeLocation(file_path, i),
-                        code_snippet=self.extract_code_snippet(content, i),
+                        code_snippet=self.extract_code_snippet_from_lines(lines, i),
                         metadata={
                             'trigger_type': trigger_type,
                             'component': component,
@@ -143,19 +183,25 @@ class ReactScanner(BaseScanner):
                             'is_ui_trigger': True
                         }
                     )
-                    self.graph.add_node(trigger_node)
+                    nodes.append(trigger_node)
 
+        self.graph.add_nodes(nodes)
         return triggers
 
-    def _detect_http_calls(self, file_path: str, content: str) -> List[HTTPCall]:
+    def _detect_http_calls(self, file_path: str, content: str, lines: List[str], line_starts) -> List[HTTPCall]:
         """Find HTTP calls (fetch, axios, etc.)."""
         http_calls = []
-        lines = content.split('\n')
+        nodes = []
 
-        for i, line in enumerate(lines, 1):
+        for i in self.matching_lines(self._HTTP_LITERALS, content, line_starts):
+            line = lines[i - 1]
+            upper = line.upper()
+            dotted_i = '\u0130' in line
             # Check each HTTP pattern
-            for pattern, lib_type in self.HTTP_PATTERNS:
-                match = re.search(pattern, line, re.IGNORECASE)
+            for pattern, lib_type in self._HTTP_RES:
+                if self._HTTP_UPPER_LITERALS[lib_type] not in upper and not dotted_i:
+                    continue
+                match = pattern.search(line)
                 if match:
                     if lib_type == 'fetch':
                         endpoint = match.group(1)
@@ -184,14 +230,15 @@ class ReactScanner(BaseScanner):
                         location=CodeLocation(file_path, i),
                         endpoint=endpoint,
                         method=method,
-                        code_snippet=self.extract_code_snippet(content, i),
+                        code_snippet=self.extract_code_snippet_from_lines(lines, i),
                         metadata={
                             'library': lib_type,
                             'is_frontend_call': True
                         }
                     )
-                    self.graph.add_node(http_node)
+                    nodes.append(http_node)
 
+        self.graph.add_nodes(nodes)
         return http_calls
 
     def _extract_method_from_context(self, lines: List[str], line_num: int) -> Optional[str]:
@@ -201,7 +248,7 @@ class ReactScanner(BaseScanner):
         context = ' '.join(context_lines)
 
         # Look for method: 'POST' pattern
-        method_match = re.search(r'method\s*:\s*[\'"](\w+)[\'"]', context, re.IGNORECASE)
+        method_match = self._FETCH_METHOD_RE.search(context)
         if method_match:
             return method_match.group(1).upper()
 
@@ -210,27 +257,37 @@ class ReactScanner(BaseScanner):
     def _build_ui_workflows(self, ui_triggers: List[UITrigger], http_calls: List[HTTPCall]):
         """Build workflow chains connecting UI triggers to HTTP calls."""
         # For each UI trigger, find HTTP calls that are likely related
-        # (within same function scope, close line numbers)
+        # (within same function scope, close line numbers). A line-sorted copy
+        # of the calls lets the window be found with bisect
+        by_line = sorted((http_call.location.line_number, index) for index, http_call in enumerate(http_calls))
+        call_lines = [line for line, _ in by_line]
+        call_indices = [index for _, index in by_line]
+        edges = []
 
         for trigger in ui_triggers:
-            # Find HTTP calls within ~50 lines of the trigger
-            for http_call in http_calls:
-                line_distance = abs(http_call.location.line_number - trigger.location.line_number)
-
-                # If HTTP call is close to the trigger (likely related)
-                if line_distance <= 50:
-                    # Create edge from UI trigger to HTTP call
-                    trigger_node_id = f"{trigger.location.file_path}:ui_trigger:{trigger.location.line_number}"
-                    http_node_id = f"{http_call.location.file_path}:http:{http_call.location.line_number}"
-
-                    edge = WorkflowEdge(
-                        source=trigger_node_id,
-                        target=http_node_id,
-                        label="User Action → API Call",
-                        metadata={
-                            'workflow_type': 'ui_to_api',
-                            'trigger_type': trigger.trigger_type,
-                            'url': trigger.url
-                        }
-                    )
-                    self.graph.add_edge(edge)
+            trigger_line = trigger.location.line_number
+
+            # Find HTTP calls within ~50 lines of the trigger (likely related),
+            # keeping edges in the original HTTP call order
+            lo = bisect.bisect_left(call_lines, trigger_line - 50)
+            hi = bisect.bisect_right(call_lines, trigger_line + 50)
+            for index in sorted(call_indices[lo:hi]):
+                http_call = http_calls[index]
+
+                # Create edge from UI trigger to HTTP call
+                trigger_node_id = f"{trigger.location.file_path}:ui_trigger:{trigger_line}"
+                http_node_id = f"{http_call.location.file_path}:http:{http_call.location.line_number}"
+
+                edge = WorkflowEdge(
+                    source=trigger_node_id,
+                    target=http_node_id,
+                    label="User Action → API Call",
+                    metadata={
+                        'workflow_type': 'ui_to_api',
+                        'trigger_type': trigger.trigger_type,
+                        'url': trigger.url
+                    }
+                )
+                edges.append(edge)
+
+        self.graph.add_edges(edges)
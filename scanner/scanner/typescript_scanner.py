@@ -1,8 +1,10 @@
 """TypeScript/Angular scanner for workflow detection."""
 
+import bisect
 import re
+from array import array
 from typing import List
-from .base import BaseScanner
+from .base import BaseScanner, leading_literal, line_alternation, prescan_re
 from models import (
     WorkflowGraph, WorkflowNode, WorkflowType, CodeLocation
 )
@@ -11,6 +13,8 @@ from models import (
 class TypeScriptScanner(BaseScanner):
     """Scanner for TypeScript/Angular code to detect data workflows."""
 
+    file_extensions = ('.ts', '.js', '.tsx', '.jsx')
+
     # HTTP client patterns (Angular HttpClient)
     HTTP_PATTERNS = [
         r'http\.get',
@@ -39,144 +43,195 @@ class TypeScriptScanner(BaseScanner):
         r'Blob',
     ]
 
+    # RxJS / array transformation operators
+    RXJS_OPERATOR_PATTERNS = [
+        r'\.pipe\s*\(',
+        r'\.map\s*\(',
+        r'\.filter\s*\(',
+        r'\.reduce\s*\(',
+        r'\.switchMap\s*\(',
+        r'\.mergeMap\s*\(',
+        r'\.concatMap\s*\(',
+    ]
+
+    # Compiled once at class creation. A line yields the same node whichever
+    # pattern of a family matches, so each family is one alternation, run once
+    # over the whole file to find the lines that get a node. These run on RE2 when
+    # it is installed, except the case-insensitive HTTP family: Python folds 'i'
+    # together with U+0130/U+0131 and RE2 doesn't
+    _HTTP_RE = line_alternation(HTTP_PATTERNS, ignore_case=True)
+    _STORAGE_RE = line_alternation(STORAGE_PATTERNS, engine=prescan_re)
+    _FILE_RE = line_alternation(FILE_PATTERNS, engine=prescan_re)
+    # Every operator occurrence, with group 2 set when it is called: the first
+    # occurrence on a line names the operator, any called one makes it a transform
+    # (one pass instead of the family search plus a name search per line)
+    _RXJS_OPERATOR_RE = line_alternation([r'\.(pipe|map|filter|reduce|switchMap|mergeMap|concatMap)(\s*\()?'],
+                                         engine=prescan_re)
+
+    # The ASCII literals the patterns start with (the HTTP ones case-insensitively),
+    # matched against the raw bytes so a file without any of them is skipped before
+    # it is decoded and split. Only pure-ASCII files are skipped: under IGNORECASE
+    # 'axios' also matches non-ASCII letters such as U+0131 in the decoded text
+    _WORKFLOW_LITERALS = prescan_re.compile(
+        b'(?i:' + b'|'.join(re.escape(leading_literal(p)).encode() for p in HTTP_PATTERNS) + b')|'
+        + b'|'.join(re.escape(leading_literal(p)).encode()
+                    for p in STORAGE_PATTERNS + FILE_PATTERNS + RXJS_OPERATOR_PATTERNS)
+    )
+
+    _URL_LITERAL_RE = re.compile(r'[\'"`](https?://[^\'"`]+|/[^\'"`]*)[\'"`]')
+    _TEMPLATE_LITERAL_RE = re.compile(r'`([^`]*)`')
+    _API_URL_LITERAL_RE = re.compile(r'[\'"`](https?://[^\'"`]+|/api/[^\'"`]*)[\'"`]')
+    # (method, '.METHOD', case-insensitive call regex). Every character IGNORECASE
+    # lets through for these letters upper-cases onto them, so a method whose
+    # '.METHOD' is missing from line.upper() is ruled out without the regex
+    _HTTP_METHOD_RES = [(method.upper(), '.' + method.upper(), re.compile(rf'\.{method}\s*\(', re.IGNORECASE))
+                        for method in ('get', 'post', 'put', 'delete', 'patch')]
+    _STORAGE_KEY_RE = re.compile(r'(?:getItem|setItem)\s*\(\s*[\'"]([^\'"]+)[\'"]')
+
     def can_scan(self, file_path: str) -> bool:
         """Check if file is a TypeScript/JavaScript file."""
-        return file_path.endswith(('.ts', '.js', '.tsx', '.jsx'))
+        return file_path.endswith(self.file_extensions)
 
-    def scan_file(self, file_path: str, schema_registry: dict = None) -> WorkflowGraph:
+    def scan_file(self, file_path: str, schema_registry: dict = None, data: bytes = None) -> WorkflowGraph:
         """Scan TypeScript file for workflow patterns."""
         self.graph = WorkflowGraph()
-        content = self.read_file(file_path)
+        detect_http = self.should_detect_type('api_calls')
+        detect_files = self.should_detect_type('file_io')
+        detect_storage = self.should_detect_type('cache')
+        detect_transforms = self.should_detect_type('data_transforms')
+        # Nothing to look for: don't read the file at all
+        if not (detect_http or detect_files or detect_storage or detect_transforms):
+            return self.graph
+        if data is not None and data.isascii() and not self._WORKFLOW_LITERALS.search(data):
+            return self.graph
+        content = self.read_file(file_path, data)
+        # Split once for all phases; each phase runs its regex over the whole content
+        # and maps match offsets back to lines
+        lines = content.split('\n')
+        line_starts = self.line_starts(lines)
 
         # Scan for different workflow types
-        if self.should_detect_type('api_calls'):
-            self._scan_http_calls(file_path, content)
+        if detect_http:
+            self._scan_http_calls(file_path, content, lines, line_starts)
 
-        if self.should_detect_type('file_io'):
-            self._scan_file_operations(file_path, content)
+        if detect_files:
+            self._scan_file_operations(file_path, content, lines, line_starts)
 
         # Scan for cache/storage operations
-        self._scan_storage_operations(file_path, content)
+        if detect_storage:
+            self._scan_storage_operations(file_path, content, lines, line_starts)
 
         # Scan for data transformations (RxJS pipes, map operations)
-        if self.should_detect_type('data_transforms'):
-            self._scan_data_transforms(file_path, content)
+        if detect_transforms:
+            self._scan_data_transforms(file_path, content, lines, line_starts)
 
         return self.graph
 
-    def _scan_http_calls(self, file_path: str, content: str):
+    def _scan_http_calls(self, file_path: str, content: str, lines: List[str], line_starts: array):
         """Scan for HTTP/API calls."""
-        lines = content.split('\n')
-
-        for i, line in enumerate(lines, 1):
-            for pattern in self.HTTP_PATTERNS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    endpoint = self._extract_endpoint(line, lines, i)
-                    method = self._extract_http_method(line)
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:api:{i}",
-                        type=WorkflowType.API_CALL,
-                        name=f"API {method}: {endpoint or 'Unknown'}",
-                        description=f"HTTP API call from Angular/TypeScript",
-                        location=CodeLocation(file_path, i),
-                        endpoint=endpoint,
-                        method=method,
-                        code_snippet=self.extract_code_snippet(content, i),
-                    )
-                    self.graph.add_node(node)
-                    break
-
-    def _scan_file_operations(self, file_path: str, content: str):
+        nodes = []
+        for i in self.matching_lines(self._HTTP_RE, content, line_starts):
+            line = lines[i - 1]
+            endpoint = self._extract_endpoint(line, lines, i)
+            method = self._extract_http_method(line)
+
+            node = WorkflowNode(
+                id=f"{file_path}:api:{i}",
+                type=WorkflowType.API_CALL,
+                name=f"API {method}: {endpoint or 'Unknown'}",
+                description=f"HTTP API call from Angular/TypeScript",
+                location=CodeLocation(file_path, i),
+                endpoint=endpoint,
+                method=method,
+                code_snippet=self.extract_code_snippet_from_lines(lines, i),
+            )
+            nodes.append(node)
+
+        self.graph.add_nodes(nodes)
+
+    def _scan_file_operations(self, file_path: str, content: str, lines: List[str], line_starts: array):
         """Scan for file operations."""
-        lines = content.split('\n')
-
-        for i, line in enumerate(lines, 1):
-            for pattern in self.FILE_PATTERNS:
-                if re.search(pattern, line):
-                    is_read = bool(re.search(r'read|Reader', line, re.IGNORECASE))
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:file:{i}",
-                        type=WorkflowType.FILE_READ if is_read else WorkflowType.FILE_WRITE,
-                        name=f"File {'Read' if is_read else 'Write'}",
-                        description=f"Browser file API operation",
-                        location=CodeLocation(file_path, i),
-                        code_snippet=self.extract_code_snippet(content, i),
-                    )
-                    self.graph.add_node(node)
-                    break
-
-    def _scan_storage_operations(self, file_path: str, content: str):
+        nodes = []
+        for i in self.matching_lines(self._FILE_RE, content, line_starts):
+            line = lines[i - 1]
+            # Same as a case-insensitive search for read|Reader: every character
+            # IGNORECASE lets through for these letters upper-cases onto them
+            is_read = 'READ' in line.upper()
+
+            node = WorkflowNode(
+                id=f"{file_path}:file:{i}",
+                type=WorkflowType.FILE_READ if is_read else WorkflowType.FILE_WRITE,
+                name=f"File {'Read' if is_read else 'Write'}",
+                description=f"Browser file API operation",
+                location=CodeLocation(file_path, i),
+                code_snippet=self.extract_code_snippet_from_lines(lines, i),
+            )
+            nodes.append(node)
+
+        self.graph.add_nodes(nodes)
+
+    def _scan_storage_operations(self, file_path: str, content: str, lines: List[str], line_starts: array):
         """Scan for localStorage, sessionStorage, IndexedDB operations."""
-        lines = content.split('\n')
-
-        for i, line in enumerate(lines, 1):
-            for pattern in self.STORAGE_PATTERNS:
-                if re.search(pattern, line):
-                    is_read = bool(re.search(r'getItem|get', line))
-                    storage_key = self._extract_storage_key(line)
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:cache:{i}",
-                        type=WorkflowType.CACHE_READ if is_read else WorkflowType.CACHE_WRITE,
-                        name=f"Cache {'Read' if is_read else 'Write'}: {storage_key or 'Unknown'}",
-                        description=f"Browser storage operation",
-                        location=CodeLocation(file_path, i),
-                        code_snippet=self.extract_code_snippet(content, i),
-                        metadata={'key': storage_key}
-                    )
-                    self.graph.add_node(node)
-                    break
-
-    def _scan_data_transforms(self, file_path: str, content: str):
+        nodes = []
+        for i in self.matching_lines(self._STORAGE_RE, content, line_starts):
+            line = lines[i - 1]
+            is_read = 'get' in line  # also covers 'getItem'
+            storage_key = self._extract_storage_key(line)
+
+            node = WorkflowNode(
+                id=f"{file_path}:cache:{i}",
+                type=WorkflowType.CACHE_READ if is_read else WorkflowType.CACHE_WRITE,
+                name=f"Cache {'Read' if is_read else 'Write'}: {storage_key or 'Unknown'}",
+                description=f"Browser storage operation",
+                location=CodeLocation(file_path, i),
+                code_snippet=self.extract_code_snippet_from_lines(lines, i),
+                metadata={'key': storage_key}
+            )
+            nodes.append(node)
+
+        self.graph.add_nodes(nodes)
+
+    def _scan_data_transforms(self, file_path: str, content: str, lines: List[str], line_starts: array):
         """Scan for data transformation operations (RxJS, map, reduce, etc.)."""
-        lines = content.split('\n')
-
-        # RxJS operators
-        rxjs_operators = [
-            r'\.pipe\s*\(',
-            r'\.map\s*\(',
-            r'\.filter\s*\(',
-            r'\.reduce\s*\(',
-            r'\.switchMap\s*\(',
-            r'\.mergeMap\s*\(',
-            r'\.concatMap\s*\(',
-        ]
-
-        for i, line in enumerate(lines, 1):
-            for pattern in rxjs_operators:
-                if re.search(pattern, line):
-                    operator = re.search(r'\.(pipe|map|filter|reduce|switchMap|mergeMap|concatMap)', line)
-                    operator_name = operator.group(1) if operator else 'transform'
-
-                    node = WorkflowNode(
-                        id=f"{file_path}:transform:{i}",
-                        type=WorkflowType.DATA_TRANSFORM,
-                        name=f"Data Transform: {operator_name}",
-                        description=f"Data transformation using {operator_name}",
-                        location=CodeLocation(file_path, i),
-                        code_snippet=self.extract_code_snippet(content, i),
-                        metadata={'operator': operator_name}
-                    )
-                    self.graph.add_node(node)
-                    break
+        nodes = []
+        operator_names = {}
+        called = []
+        for match in self._RXJS_OPERATOR_RE.finditer(content):
+            i = bisect.bisect_right(line_starts, match.start())
+            operator_names.setdefault(i, match.group(1))
+            if match.group(2) is not None and (not called or called[-1] != i):
+                called.append(i)
+
+        for i in called:
+            operator_name = operator_names[i]
+            node = WorkflowNode(
+                id=f"{file_path}:transform:{i}",
+                type=WorkflowType.DATA_TRANSFORM,
+                name=f"Data Transform: {operator_name}",
+                description=f"Data transformation using {operator_name}",
+                location=CodeLocation(file_path, i),
+                code_snippet=self.extract_code_snippet_from_lines(lines, i),
+                metadata={'operator': operator_name}
+            )
+            nodes.append(node)
+
+        self.graph.add_nodes(nodes)
 
     def _extract_endpoint(self, line: str, all_lines: List[str], line_num: int) -> str:
         """Extract API endpoint from HTTP call."""
         # Look for URL in string literals or template literals
-        url_match = re.search(r'[\'"`](https?://[^\'"`]+|/[^\'"`]*)[\'"`]', line)
+        url_match = self._URL_LITERAL_RE.search(line)
         if url_match:
             return url_match.group(1)
 
         # Look for template literals with ${...}
-        template_match = re.search(r'`([^`]*)`', line)
+        template_match = self._TEMPLATE_LITERAL_RE.search(line)
         if template_match:
             return template_match.group(1)
 
         # Look in nearby lines
         for i in range(max(0, line_num - 3), min(len(all_lines), line_num + 1)):
-            url_match = re.search(r'[\'"`](https?://[^\'"`]+|/api/[^\'"`]*)[\'"`]', all_lines[i])
+            url_match = self._API_URL_LITERAL_RE.search(all_lines[i])
             if url_match:
                 return url_match.group(1)
 
@@ -184,16 +239,9 @@ class TypeScriptScanner(BaseScanner):
 
     def _extract_http_method(self, line: str) -> str:
         """Extract HTTP method from call."""
-        methods = {
-            'get': 'GET',
-            'post': 'POST',
-            'put': 'PUT',
-            'delete': 'DELETE',
-            'patch': 'PATCH',
-        }
-
-        for method, http_method in methods.items():
-            if re.search(rf'\.{method}\s*\(', line, re.IGNORECASE):
+        upper = line.upper()
+        for http_method, dotted, pattern in self._HTTP_METHOD_RES:
+            if dotted in upper and pattern.search(line):
                 return http_method
 
         return 'HTTP'
@@ -201,7 +249,7 @@ class TypeScriptScanner(BaseScanner):
     def _extract_storage_key(self, line: str) -> str:
         """Extract storage key from localStorage/sessionStorage operation."""
         # Look for string literal as first parameter
-        match = re.search(r'(?:getItem|setItem)\s*\(\s*[\'"]([^\'"]+)[\'"]', line)
+        match = self._STORAGE_KEY_RE.search(line)
         if match:
             return match.group(1)
         return None
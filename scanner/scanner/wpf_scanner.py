@@ -1,18 +1,66 @@
 """WPF/XAML scanner for desktop UI workflow detection."""
 
+import bisect
+import functools
+import os
 import re
-from typing import List, Dict, Any, Optional
+from array import array
+from typing import List, Dict, Any, NamedTuple, Optional
 from pathlib import Path
 
-from .base import BaseScanner
+from .base import BaseScanner, line_alternation, prescan_re
 from models import (
     WorkflowGraph, WorkflowNode, WorkflowEdge, WorkflowType, CodeLocation
 )
 
 
+class _UITrigger(NamedTuple):
+    """An event binding found in XAML, kept for workflow building."""
+    trigger_type: str
+    window: str
+    handler: str
+    location: CodeLocation
+    node_id: str  # ID of the trigger node, reused for the workflow edges
+
+
+class _HTTPCall(NamedTuple):
+    """An HTTP call found in code-behind, kept for workflow building."""
+    method: str
+    endpoint: str
+    location: CodeLocation
+    node_id: str
+
+
+def _load_sibling(path: str) -> Optional[str]:
+    """Read the XAML or code-behind file paired with the one being scanned.
+
+    Returns None if it is missing or unreadable. Its mtime/size key the read
+    cache, so a pair scanned from both sides is read once until it changes.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _read_sibling(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_sibling(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
 class WPFScanner(BaseScanner):
     """Scanner for WPF/XAML desktop application UI workflows."""
 
+    file_extensions = ('.xaml', '.xaml.cs')
+
+    # XAML and code-behind scans read each other's files, so results can't be cached by this file's hash alone
+    cacheable = False
+
     # XAML Event Handler Patterns
     XAML_EVENT_PATTERNS = [
         (r'Click\s*=\s*"([^"]+)"', 'ui_click'),                      # Click="Button_Click"
@@ -61,42 +109,65 @@ class WPFScanner(BaseScanner):
         r'this\.NavigationService\.Navigate',                        # this.NavigationService.Navigate
     ]
 
+    # Compiled once at class creation; the scan loops call these directly instead
+    # of going through re.search's pattern cache for every line
+    _XAML_EVENT_RES = [(re.compile(pattern), trigger_type) for pattern, trigger_type in XAML_EVENT_PATTERNS]
+    _EVENT_HANDLER_METHOD_RES = [re.compile(pattern) for pattern in EVENT_HANDLER_METHOD_PATTERNS]
+    _HTTP_RES = [(re.compile(pattern), method_or_type) for pattern, method_or_type in HTTP_PATTERNS]
+    _WINDOW_RES = [re.compile(pattern) for pattern in WINDOW_PATTERNS]
+
+    # Every pattern that matches a line yields its own node (or handler), so the
+    # per-pattern loops stay; one alternation per family, run over the whole
+    # file, finds the only lines they need to visit. The handler method family
+    # stays on re: RE2's \w is ASCII-only
+    _XAML_EVENT_ANY = line_alternation([pattern for pattern, _ in XAML_EVENT_PATTERNS], engine=prescan_re)
+    _EVENT_HANDLER_METHOD_ANY = line_alternation(EVENT_HANDLER_METHOD_PATTERNS)
+    _HTTP_ANY = line_alternation([pattern for pattern, _ in HTTP_PATTERNS], engine=prescan_re)
+
     def can_scan(self, file_path: str) -> bool:
         """Check if file is a WPF XAML or code-behind file."""
-        return file_path.endswith(('.xaml', '.xaml.cs'))
+        return file_path.endswith(self.file_extensions)
 
-    def scan_file(self, file_path: str, schema_registry: dict = None) -> WorkflowGraph:
+    def scan_file(self, file_path: str, schema_registry: dict = None, data: bytes = None) -> WorkflowGraph:
         """Scan WPF file for UI workflows."""
         self.graph = WorkflowGraph()
-        content = self.read_file(file_path)
+        content = self.read_file(file_path, data)
 
         is_xaml = file_path.endswith('.xaml')
         is_codebehind = file_path.endswith('.xaml.cs')
 
+        # Each text is split once; the detectors run their regexes over the whole
+        # text and map match offsets back to lines
         if is_xaml:
             # Scan XAML for event handlers
             window_name = self._detect_window_name(content, file_path)
-            ui_triggers = self._detect_ui_triggers_from_xaml(file_path, content, window_name)
+            lines = content.split('\n')
+            ui_triggers = self._detect_ui_triggers_from_xaml(file_path, content, lines, self.line_starts(lines), window_name)
 
             # Try to load code-behind to find event handler implementations
             codebehind_content = self._try_load_codebehind(file_path)
             if codebehind_content:
-                http_calls = self._detect_http_calls(file_path + '.cs', codebehind_content)
+                codebehind_lines = codebehind_content.split('\n')
+                http_calls = self._detect_http_calls(file_path + '.cs', codebehind_content, codebehind_lines,
+                                                     self.line_starts(codebehind_lines))
                 self._build_ui_workflows(ui_triggers, http_calls)
 
         elif is_codebehind:
             # Scan code-behind for HTTP calls and event handlers
             window_name = self._detect_window_name(content, file_path)
-            event_handlers = self._detect_event_handler_methods(file_path, content, window_name)
-            http_calls = self._detect_http_calls(file_path, content)
+            lines = content.split('\n')
+            line_starts = self.line_starts(lines)
+            event_handlers = self._detect_event_handler_methods(file_path, content, lines, line_starts, window_name)
+            http_calls = self._detect_http_calls(file_path, content, lines, line_starts)
 
             # Try to load XAML to find UI event bindings
             xaml_path = file_path.replace('.xaml.cs', '.xaml')
-            if Path(xaml_path).exists():
+            xaml_content = _load_sibling(xaml_path)
+            if xaml_content is not None:
                 try:
-                    with open(xaml_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        xaml_content = f.read()
-                    ui_triggers = self._detect_ui_triggers_from_xaml(xaml_path, xaml_content, window_name)
+                    xaml_lines = xaml_content.split('\n')
+                    ui_triggers = self._detect_ui_triggers_from_xaml(xaml_path, xaml_content, xaml_lines,
+                                                                     self.line_starts(xaml_lines), window_name)
                     self._build_ui_workflows(ui_triggers, http_calls, event_handlers)
                 except:
                     pass
@@ -105,8 +176,8 @@ class WPFScanner(BaseScanner):
 
     def _detect_window_name(self, content: str, file_path: str) -> str:
         """Extract window/page name from XAML or C# file."""
-        for pattern in self.WINDOW_PATTERNS:
-            match = re.search(pattern, content)
+        for pattern in self._WINDOW_RES:
+            match = pattern.search(content)
             if match:
                 name = match.group(1)
                 # Extract just the class name if it's a full namespace
@@ -117,14 +188,16 @@ class WPFScanner(BaseScanner):
         # Fallback to filename
         return Path(file_path).stem.replace('.xaml', '').replace('.cs', '')
 
-    def _detect_ui_triggers_from_xaml(self, file_path: str, xaml_content: str, window_name: str) -> List:
+    def _detect_ui_triggers_from_xaml(self, file_path: str, xaml_content: str, lines: List[str], line_starts: array,
+                                      window_name: str) -> List[_UITrigger]:
         """Find WPF event handlers in XAML."""
         triggers = []
-        lines = xaml_content.split('\n')
+        nodes = []
 
-        for i, line in enumerate(lines, 1):
-            for pattern, trigger_type in self.XAML_EVENT_PATTERNS:
-                match = re.search(pattern, line)
+        for i in self.matching_lines(self._XAML_EVENT_ANY, xaml_content, line_starts):
+            line = lines[i - 1]
+            for pattern, trigger_type in self._XAML_EVENT_RES:
+                match = pattern.search(line)
                 if match:
                     handler = match.group(1).strip()
 
@@ -135,7 +208,7 @@ class WPFScanner(BaseScanner):
                         name=f"WPF: {trigger_type.replace('ui_', '').title()}",
                         description=f"WPF event binding in {window_name}",
                         location=CodeLocation(file_path, i),
-                        code_snippet=self.extract_code_snippet(xaml_content, i),
+                        code_snippet=self.extract_code_snippet_from_lines(lines, i),
                         metadata={
                             'trigger_type': trigger_type,
                             'window': window_name,
@@ -144,28 +217,23 @@ class WPFScanner(BaseScanner):
                             'framework': 'WPF'
                         }
                     )
-                    self.graph.add_node(trigger_node)
+                    nodes.append(trigger_node)
 
                     # Store trigger for later workflow building
-                    class UITrigger:
-                        pass
-                    trigger_obj = UITrigger()
-                    trigger_obj.trigger_type = trigger_type
-                    trigger_obj.window = window_name
-                    trigger_obj.handler = handler
-                    trigger_obj.location = CodeLocation(file_path, i)
-                    triggers.append(trigger_obj)
+                    triggers.append(_UITrigger(trigger_type, window_name, handler, CodeLocation(file_path, i), trigger_node.id))
 
+        self.graph.add_nodes(nodes)
         return triggers
 
-    def _detect_event_handler_methods(self, file_path: str, content: str, window_name: str) -> Dict[str, CodeLocation]:
+    def _detect_event_handler_methods(self, file_path: str, content: str, lines: List[str], line_starts: array,
+                                      window_name: str) -> Dict[str, CodeLocation]:
         """Find event handler method definitions in code-behind."""
         handlers = {}
-        lines = content.split('\n')
 
-        for i, line in enumerate(lines, 1):
-            for pattern in self.EVENT_HANDLER_METHOD_PATTERNS:
-                match = re.search(pattern, line)
+        for i in self.matching_lines(self._EVENT_HANDLER_METHOD_ANY, content, line_starts):
+            line = lines[i - 1]
+            for pattern in self._EVENT_HANDLER_METHOD_RES:
+                match = pattern.search(line)
                 if match:
                     handler_name = match.group(1)
                     handlers[handler_name] = CodeLocation(file_path, i)
@@ -174,23 +242,17 @@ class WPFScanner(BaseScanner):
 
     def _try_load_codebehind(self, xaml_path: str) -> Optional[str]:
         """Try to load the associated code-behind .cs file."""
-        codebehind_path = xaml_path + '.cs'
-        if Path(codebehind_path).exists():
-            try:
-                with open(codebehind_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
-            except:
-                pass
-        return None
+        return _load_sibling(xaml_path + '.cs')
 
-    def _detect_http_calls(self, file_path: str, content: str) -> List:
+    def _detect_http_calls(self, file_path: str, content: str, lines: List[str], line_starts: array) -> List[_HTTPCall]:
         """Find HTTP calls in C# code-behind."""
         http_calls = []
-        lines = content.split('\n')
+        nodes = []
 
-        for i, line in enumerate(lines, 1):
-            for pattern, method_or_type in self.HTTP_PATTERNS:
-                match = re.search(pattern, line)
+        for i in self.matching_lines(self._HTTP_ANY, content, line_starts):
+            line = lines[i - 1]
+            for pattern, method_or_type in self._HTTP_RES:
+                match = pattern.search(line)
                 if match:
                     # Determine method and endpoint
                     if method_or_type in ['HttpClient', 'WebClient']:
@@ -209,31 +271,30 @@ class WPFScanner(BaseScanner):
                         location=CodeLocation(file_path, i),
                         endpoint=endpoint,
                         method=method,
-                        code_snippet=self.extract_code_snippet(content, i),
+                        code_snippet=self.extract_code_snippet_from_lines(lines, i),
                         metadata={
                             'library': 'HttpClient/WebClient',
                             'is_frontend_call': True,
                             'framework': 'WPF'
                         }
                     )
-                    self.graph.add_node(http_node)
+                    nodes.append(http_node)
 
                     # Store for workflow building
-                    class HTTPCall:
-                        pass
-                    http_call = HTTPCall()
-                    http_call.method = method
-                    http_call.endpoint = endpoint
-                    http_call.location = CodeLocation(file_path, i)
-                    http_calls.append(http_call)
+                    http_calls.append(_HTTPCall(method, endpoint, CodeLocation(file_path, i), http_node.id))
 
+        self.graph.add_nodes(nodes)
         return http_calls
 
-    def _build_ui_workflows(self, ui_triggers: List, http_calls: List, event_handlers: Dict[str, CodeLocation] = None):
+    def _build_ui_workflows(self, ui_triggers: List[_UITrigger], http_calls: List[_HTTPCall], event_handlers: Dict[str, CodeLocation] = None):
         """Build workflow chains connecting XAML events to code-behind HTTP calls."""
         if event_handlers is None:
             event_handlers = {}
 
+        # _detect_http_calls reports calls in line order, so a handler's window
+        # can be found with bisect and sliced without reordering the edges
+        call_lines = [http_call.location.line_number for http_call in http_calls]
+        edges = []
         for trigger in ui_triggers:
             handler_name = trigger.handler
 
@@ -242,38 +303,33 @@ class WPFScanner(BaseScanner):
                 handler_location = event_handlers[handler_name]
 
                 # Find HTTP calls within this handler (within ~50 lines)
-                for http_call in http_calls:
-                    line_distance = abs(http_call.location.line_number - handler_location.line_number)
-
-                    if line_distance <= 50:
-                        # Create edge from UI trigger to HTTP call
-                        trigger_node_id = f"{trigger.location.file_path}:ui_trigger:{trigger.location.line_number}"
-                        http_node_id = f"{http_call.location.file_path}:http:{http_call.location.line_number}"
-
-                        edge = WorkflowEdge(
-                            source=trigger_node_id,
-                            target=http_node_id,
-                            label="WPF Event → HTTP Call",
-                            metadata={
-                                'workflow_type': 'wpf_ui_to_api',
-                                'trigger_type': trigger.trigger_type,
-                                'handler': handler_name,
-                                'framework': 'WPF'
-                            }
-                        )
-                        self.graph.add_edge(edge)
+                handler_line = handler_location.line_number
+                lo = bisect.bisect_left(call_lines, handler_line - 50)
+                hi = bisect.bisect_right(call_lines, handler_line + 50)
+                for http_call in http_calls[lo:hi]:
+                    # Create edge from UI trigger to HTTP call
+                    edge = WorkflowEdge(
+                        source=trigger.node_id,
+                        target=http_call.node_id,
+                        label="WPF Event → HTTP Call",
+                        metadata={
+                            'workflow_type': 'wpf_ui_to_api',
+                            'trigger_type': trigger.trigger_type,
+                            'handler': handler_name,
+                            'framework': 'WPF'
+                        }
+                    )
+                    edges.append(edge)
             else:
                 # Handler not found in code-behind, still try proximity matching
+                codebehind_path = trigger.location.file_path.replace('.xaml', '.xaml.cs')
                 for http_call in http_calls:
                     # If HTTP call is in the code-behind file (same base name)
-                    if trigger.location.file_path.replace('.xaml', '.xaml.cs') == http_call.location.file_path:
+                    if codebehind_path == http_call.location.file_path:
                         # Create edge (less certain connection)
-                        trigger_node_id = f"{trigger.location.file_path}:ui_trigger:{trigger.location.line_number}"
-                        http_node_id = f"{http_call.location.file_path}:http:{http_call.location.line_number}"
-
                         edge = WorkflowEdge(
-                            source=trigger_node_id,
-                            target=http_node_id,
+                            source=trigger.node_id,
+                            target=http_call.node_id,
                             label="WPF Event → HTTP Call (proximity)",
                             metadata={
                                 'workflow_type': 'wpf_ui_to_api_proximity',
@@ -282,4 +338,6 @@ class WPFScanner(BaseScanner):
                                 'framework': 'WPF'
                             }
                         )
-                        self.graph.add_edge(edge)
+                        edges.append(edge)
+
+        self.graph.add_edges(edges)